@@ -0,0 +1,104 @@
+"""Equivalence fuzzing and benchmark for src/utils/text_cleaner.clean_release_text.
+
+Compares the single-scan cleaner against the original multi-pass regex implementation on random
+documents built from dateline/terminator fragments, then times both on large pathological inputs.
+
+    python bench_text_cleaner.py --cases 20000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from src.utils.text_cleaner import clean_release_text
+
+
+def legacy_clean_text(text: str) -> str:
+    """The cleaner as it was in TXTCollector and main_crawl4ai before the shared implementation"""
+    text = re.sub(r'^.*?Washington,?\s*?D\.?C\.?,?\s*?(?:(?:Jan|Feb|Mar|Apr|Jun(?:e)?|Jul|Aug|Sep(?:t)?|Oct|Nov|Dec)\.?|(?:January|February|March|April|May|June|July|August|September|October|November|December))\s+?\d{1,2},?\s+?\d{4}\s*?[—–-]{1,2}?\s*?', '', text, flags=re.DOTALL | re.IGNORECASE).strip()
+    text = re.sub(r'^(?:-{1,2}|—|–)\s*', '', text).strip()
+    lines = text.splitlines()
+    cleaned_lines = []
+    found_separator = False
+    for line in lines:
+        line = line.strip()
+        if not found_separator:
+            if line in ['#  #  #', '*  *  *', '# # #', '* * *', '###', '***']:
+                found_separator = True
+                continue
+        if not found_separator:
+            cleaned_lines.append(line)
+    text = ' '.join(cleaned_lines)
+    text = ' '.join(text.split())
+    text = re.sub(r'\s*(?:[#*](?:\s*[#*]\s*){2,}).*$', '', text, flags=re.DOTALL)
+    return text.strip()
+
+
+FRAGMENTS = [
+    'Washington', 'WASHINGTON', 'washington,', 'D.C.', 'DC', 'D.C', ',', ' ', '  ', '\n', '\r\n', '\t', '\x0c',
+    '\x1c', ' ', ' ', 'Jan.', 'January', 'May', 'Sept.', 'Sep', 'June', 'Dec', '5', '12', '123', ', ',
+    '1999', '2001', '-', '--', '—', '–', '#', '*', '###', '# # #', '*  *  *', '\n###\n', '\n* * *\n',
+    'The Commission', 'today', 'announced', 'x', 'SEC', '.',
+]
+
+
+def random_document(rng):
+    return ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 60)))
+
+
+def realistic_document(rng):
+    body = ' '.join(rng.choice(['The', 'Commission', 'today', 'filed', 'charges', 'against']) for _ in range(40))
+    return (f"FOR IMMEDIATE RELEASE\n1999-{rng.randint(1, 200)}\n\nWashington, D.C., "
+            f"{rng.choice(['Jan.', 'March', 'Sept.', 'May'])} {rng.randint(1, 28)}, 1999 -- {body}\n\n# # #\nFooter")
+
+
+def fuzz(cases, seed):
+    rng = random.Random(seed)
+    for i in range(cases):
+        text = random_document(rng) if i % 4 else realistic_document(rng)
+        expected, actual = legacy_clean_text(text), clean_release_text(text)
+        if expected != actual:
+            print(f"Mismatch for {text!r}:\n  legacy: {expected!r}\n  new:    {actual!r}")
+            return False
+    print(f"{cases} random documents: outputs identical")
+    return True
+
+
+def pathological_inputs(size):
+    words = 'lorem ipsum dolor sit amet '
+    return {
+        'no dateline': words * (size // len(words)),
+        'dateline at end': words * (size // len(words)) + 'Washington, D.C., Jan. 5, 1999 -- tail',
+        'undated Washington repeats': 'Washington, D.C., ' * (size // 18),
+        'whitespace runs': ('Washington D.C.' + ' ' * 200 + 'Jan.' + ' ' * 200) * (size // 420),
+        'marks without terminator': '# x * y ' * (size // 8),
+    }
+
+
+def benchmark(size, repeat):
+    for name, text in pathological_inputs(size).items():
+        timings = []
+        for clean in (legacy_clean_text, clean_release_text):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                clean(text)
+            timings.append((time.perf_counter() - start) / repeat * 1000)
+        print(f"{name:<28} legacy {timings[0]:9.2f} ms   single-scan {timings[1]:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz and benchmark the press release text cleaner")
+    parser.add_argument('--cases', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, default=2_000_000, help="Characters per pathological input")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not fuzz(args.cases, args.seed):
+        return 1
+    benchmark(args.size, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
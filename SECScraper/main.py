@@ -1,10 +1,12 @@
 import logging
-import pandas as pd
-from typing import List, Dict
-from src.collectors.html_collector import HTMLCollector
-from src.collectors.txt_collector import TXTCollector
+import time
+from collections import deque
+from typing import List, Dict, Optional
+from urllib.parse import urlsplit
 import os
 
+# pandas, bs4 and html2text are imported inside the functions that use them to keep startup fast
+
 def setup_logging():
     """Set up logging configuration"""
     logging.basicConfig(
@@ -16,91 +18,173 @@ def setup_logging():
         ]
     )
 
-def collect_press_releases(start_year: int, end_year: int, max_retries: int = 3) -> List[Dict]:
-    """Collect all press releases within the specified year range"""
+def _is_html(url: str) -> bool:
+    url = url.lower()
+    return url.endswith('.htm') or url.endswith('.html')
+
+
+def _is_pdf(url: str) -> bool:
+    return url.lower().endswith('.pdf')
+
+
+def collect_press_releases(start_year: int, end_year: int, max_retries: int = 3, retry_budget: int = 200,
+                           breaker_threshold: int = 5, breaker_cooldown: float = 60.0,
+                           index_file: Optional[str] = None, start_date: Optional[str] = None,
+                           end_date: Optional[str] = None, headline_pattern: Optional[str] = None,
+                           url_pattern: Optional[str] = None) -> List[Dict]:
+    """
+    Collect all press releases within the specified year range
+
+    start_date/end_date (YYYY-MM-DD), headline_pattern and url_pattern (regular expressions) filter the
+    yearly index rows before any release body is requested, and the dates also skip whole index pages.
+
+    Index pages and releases that fail are not retried inline: they go back on a deferred retry queue
+    with an exponential backoff timestamp while the remaining work is fetched. Retries across the whole
+    run are capped by retry_budget. A host with repeated connection or server errors is paused by a
+    circuit breaker; pages that load but have no usable text do not count against it.
+
+    With index_file, the release number, date, agencies and title parsed from each fetched page are
+    stored in a ReleaseIndex there.
+    """
+    from src.collectors.html_collector import HTMLCollector
+    from src.collectors.txt_collector import TXTCollector
+    from src.collectors.pdf_collector import PDFCollector
+    from src.utils.retry_queue import CircuitBreaker, FetchError, RetryQueue
+    from src.parsers.release_metadata import build_record
+    from src.utils.release_filter import filter_releases, parse_day, year_range
+
+    # A malformed date fails here, before anything is fetched; rows are then compared as days, not strings
+    start_day = parse_day(start_date) if start_date else None
+    end_day = parse_day(end_date) if end_date else None
+
     all_releases = []
     failed_items = []
+    metadata_records = []
     
     # Initialize collectors
     html_collector = HTMLCollector()
-    txt_collector = TXTCollector()
+    pdf_collector = PDFCollector()
+    txt_collector = TXTCollector(pdf_collector)
     
-    for year in range(start_year, end_year + 1):
-        logging.info(f"Processing year {year}")
-        
-        # Get all press releases for this year (with retry)
-        releases = None
-        retry_count = 0
-        
-        # Choose the correct collector based on year
-        collector = txt_collector if 1997 <= year <= 2001 else html_collector
-        while releases is None and retry_count < max_retries:
+    filtered = any((start_date, end_date, headline_pattern, url_pattern))
+    releases_by_year = {}
+
+    # Yearly index pages and release pages share one work queue, so a failing index page is deferred
+    # like a failing release instead of blocking the run with an inline sleep
+    retry_queue = RetryQueue(retry_budget=retry_budget, max_attempts=max_retries)
+    breaker = CircuitBreaker(failure_threshold=breaker_threshold, cooldown=breaker_cooldown)
+    work = deque(("index", year) for year in year_range(start_year, end_year, start_day, end_day))
+    while work or retry_queue:
+        now = time.monotonic()
+        ready = retry_queue.pop_ready(now)
+        if ready:
+            attempt, task = ready
+        elif work:
+            attempt, task = 0, work.popleft()
+        else:
+            # Only deferred items are left: wait for the earliest one
+            time.sleep(max(0.0, retry_queue.next_due() - now))
+            continue
+
+        if task[0] == "index":
+            year = task[1]
+            logging.info(f"Processing year {year}")
+            # Choose the correct collector based on year
+            collector = txt_collector if 1997 <= year <= 2001 else html_collector
             try:
                 releases = collector.get_press_releases(year)
-                if not releases:
-                    raise Exception("No releases found")
+                error = "No releases found"
             except Exception as e:
-                retry_count += 1
-                if retry_count < max_retries:
-                    logging.warning(f"Retry {retry_count}/{max_retries} getting releases for year {year}: {str(e)}")
-                    releases = None
+                releases, error = None, str(e)
+            if not releases:
+                if retry_queue.push(task, attempt + 1, time.monotonic(), error):
+                    logging.warning(f"Deferred retry {attempt + 1}/{max_retries} getting releases for year {year}: "
+                                    f"{error}")
                 else:
-                    logging.error(f"Failed to get releases for year {year} after {max_retries} retries")
+                    logging.error(f"Failed to get releases for year {year} after {attempt + 1} attempts")
+                continue
+            logging.info(f"Found {len(releases)} releases for year {year}")
+
+            # Drop unwanted rows now, before their bodies are queued for fetching
+            if filtered:
+                releases = filter_releases(releases, start_day, end_day, headline_pattern, url_pattern)
+                logging.info(f"{len(releases)} releases for year {year} match the filters")
+                if not releases:
                     continue
-        
-        if not releases:
-            logging.warning(f"No releases found for year {year}")
+            releases_by_year[year] = releases
+            work.extend(("release", year, i, release) for i, release in enumerate(releases, 1))
             continue
-        logging.info(f"Found {len(releases)} releases for year {year}")
-        
-        # Extract text from each press release (with retry)
-        year_releases = []
-        for i, release in enumerate(releases, 1):
-            retry_count = 0
-            success = False
+
+        # Extract text from each press release, deferring failures instead of retrying them inline
+        _, year, i, release = task
+        total = len(releases_by_year[year])
+        host = urlsplit(release["URL"]).netloc
+        if not breaker.allow(host, now):
+            retry_queue.defer(task, attempt, breaker.open_until(host))
+            continue
+
+        try:
+            # Choose appropriate collector based on URL extension
+            if _is_html(release["URL"]):
+                collector = html_collector
+            elif _is_pdf(release["URL"]):
+                collector = pdf_collector
+            else:
+                # The TXT collector also hands PDFs served under other extensions to the PDF collector
+                collector = txt_collector
             
-            while not success and retry_count < max_retries:
-                try:
-                    # Choose appropriate collector based on URL extension
-                    url = release["URL"].lower()
-                    collector = html_collector if url.endswith('.htm') or url.endswith('.html') else txt_collector
-                    
-                    text = collector.extract_press_release_text(release["URL"])
-                    if not text:
-                        raise Exception("Empty text returned")
-                    
-                    # Validate text content
-                    if len(text.strip()) < 20:  # Ensure text length is reasonable
-                        raise Exception("Text too short")
-                    
-                    release["Text"] = text
-                    year_releases.append(release)
-                    success = True
-                    logging.info(f"Successfully processed release {i}/{len(releases)} for year {year}")
-                    
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        logging.warning(f"Retry {retry_count}/{max_retries} for year {year} release {i}: {str(e)}")
-                    else:
-                        logging.error(f"Failed to collect year {year} release {i} after {max_retries} retries")
-                        # Add to yearly list even if extraction failed, but with empty text
-                        release["Text"] = ""
-                        year_releases.append(release)
-                        failed_items.append({
-                            "year": year,
-                            "index": i,
-                            "url": release["URL"],
-                            "error": str(e)
-                        })
-        
+            text = collector.extract_press_release_text(release["URL"])
+            metadata = collector.pop_metadata(release["URL"])
+            fetch_error = collector.pop_fetch_error(release["URL"])
+            if fetch_error:
+                raise FetchError(fetch_error)
+            # The host answered; whatever is wrong with the page below is not the host's fault
+            breaker.record_success(host)
+            if not text:
+                raise Exception("Empty text returned")
+            
+            # Validate text content
+            if len(text.strip()) < 20:  # Ensure text length is reasonable
+                raise Exception("Text too short")
+            
+            release["Text"] = text
+            metadata_records.append(build_record(release, metadata))
+            logging.info(f"Successfully processed release {i}/{total} for year {year}")
+            
+        except Exception as e:
+            # Only transport and server errors count against the host, not pages without usable text
+            if isinstance(e, FetchError) and breaker.record_failure(host, time.monotonic()):
+                logging.warning(f"Pausing requests to {host} for {breaker_cooldown} seconds after repeated failures")
+            if retry_queue.push(task, attempt + 1, time.monotonic(), str(e)):
+                logging.warning(f"Deferred retry {attempt + 1}/{max_retries} for year {year} release {i}: {str(e)}")
+            else:
+                logging.error(f"Failed to collect year {year} release {i} after {attempt + 1} attempts "
+                              f"({retry_queue.retry_budget} retries left in budget)")
+                # Keep it in the yearly list even if extraction failed, but with empty text
+                release["Text"] = ""
+                failed_items.append({
+                    "year": year,
+                    "index": i,
+                    "url": release["URL"],
+                    "error": str(e)
+                })
+
+    pdf_collector.close()
+
+    if index_file:
+        from src.utils.release_index import ReleaseIndex
+        with ReleaseIndex(index_file) as index:
+            stored = index.add(metadata_records)
+        logging.info(f"Indexed {stored}/{len(metadata_records)} releases by release number in {index_file}")
+
+    for year, year_releases in sorted(releases_by_year.items()):
         # Check completeness of year data
-        if len(year_releases) < len(releases) * 0.8:  # If success rate is below 80%
-            logging.error(f"Year {year} data might be incomplete. Only got {len(year_releases)}/{len(releases)} releases")
-            continue
+        collected = sum(1 for release in year_releases if release.get("Text"))
+        if collected < len(year_releases) * 0.8:  # If success rate is below 80%
+            logging.error(f"Year {year} data might be incomplete. Only got {collected}/{len(year_releases)} releases")
         
         all_releases.extend(year_releases)
-        logging.info(f"Successfully collected {len(year_releases)} releases for year {year}")
+        logging.info(f"Successfully collected {collected} releases for year {year}")
     
     # Final completeness check
     if not all_releases:
@@ -110,6 +194,7 @@ def collect_press_releases(start_year: int, end_year: int, max_retries: int = 3)
     if failed_items:
         logging.warning(f"Failed to collect {len(failed_items)} items")
         # Save failed items to file
+        import pandas as pd
         df = pd.DataFrame(failed_items)
         df.to_csv('failed_items.csv', index=False)
         
@@ -120,6 +205,7 @@ def save_to_csv(releases: List[Dict], output_file: str):
     if not releases:
         logging.warning("No press releases to save")
         return
+    import pandas as pd
         
     # Create DataFrame
     df = pd.DataFrame(releases)
@@ -184,15 +270,18 @@ def save_to_csv(releases: List[Dict], output_file: str):
     df.to_csv(output_file, index=False)
     logging.info(f"Saved {len(df)} press releases to {output_file}")
 
-def main():
+def main(start_year: int = 1997, end_year: int = 2011, output_file: str = "sec_press_releases.csv",
+         index_file: Optional[str] = "sec_release_index.sqlite", start_date: Optional[str] = None,
+         end_date: Optional[str] = None, headline_pattern: Optional[str] = None, url_pattern: Optional[str] = None):
     """Main function"""
     setup_logging()
     
-    # Collect press releases from 1997-2011
-    releases = collect_press_releases(1997, 2011)
+    # Collect press releases from 1997-2011 by default
+    releases = collect_press_releases(start_year, end_year, index_file=index_file, start_date=start_date,
+                                      end_date=end_date, headline_pattern=headline_pattern, url_pattern=url_pattern)
     
     # Save results
-    save_to_csv(releases, "sec_press_releases.csv")
+    save_to_csv(releases, output_file)
 
 if __name__ == "__main__":
     main()
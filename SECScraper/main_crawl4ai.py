@@ -1,43 +1,14 @@
 import asyncio
-import re
 import pandas as pd
 from crawl4ai import AsyncWebCrawler, CacheMode
 from src.collectors.txt_collector import TXTCollector
+from src.utils.text_cleaner import clean_release_text
 import time
 from typing import List, Dict
 
 def clean_text(text: str) -> str:
     """Clean text using TXTCollector's method"""
-    # Use regular expression to delete from the beginning to "Washington" after the dash
-    text = re.sub(r'^.*?Washington,?\s*?D\.?C\.?,?\s*?(?:(?:Jan|Feb|Mar|Apr|Jun(?:e)?|Jul|Aug|Sep(?:t)?|Oct|Nov|Dec)\.?|(?:January|February|March|April|May|June|July|August|September|October|November|December))\s+?\d{1,2},?\s+?\d{4}\s*?[—–-]{1,2}?\s*?', '', text, flags=re.DOTALL | re.IGNORECASE).strip()
-    
-    # Remove leading dashes and whitespace
-    text = re.sub(r'^(?:-{1,2}|—|–)\s*', '', text).strip()
-
-    # Process content line by line
-    lines = text.splitlines()
-    cleaned_lines = []
-    found_separator = False
-
-    for line in lines:
-        line = line.strip()
-        if not found_separator:
-            # Check for separator to skip
-            if line in ['#  #  #', '*  *  *', '# # #', '* * *', '###', '***']:
-                found_separator = True
-                continue
-        if not found_separator:
-            cleaned_lines.append(line)
-
-    # Join all lines into a single string
-    text = ' '.join(cleaned_lines)
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    
-    # Clean lines containing ### or *** and their subsequent content
-    text = re.sub(r'\s*(?:[#*](?:\s*[#*]\s*){2,}).*$', '', text, flags=re.DOTALL)
-    
-    return text.strip()
+    return clean_release_text(text)
 
 async def process_url(crawler: AsyncWebCrawler, url: str) -> str:
     """Process a single URL and return cleaned text"""
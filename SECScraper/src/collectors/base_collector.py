@@ -1,52 +1,89 @@
 from abc import ABC, abstractmethod
+import os
 import requests
 import time
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from urllib.parse import urlsplit
 
 class BaseCollector(ABC):
     def __init__(self):
-        self.base_url = "https://www.sec.gov"
+        # SEC_BASE_URL points the collectors at a local stand-in (see loadtest/) for offline benchmarks
+        self.base_url = os.getenv("SEC_BASE_URL", "https://www.sec.gov").rstrip("/")
         self.headers = {
             "User-Agent": "Your Name yourname@email.com",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
             "Accept-Encoding": "gzip, deflate, br",
             "Connection": "keep-alive",
-            "Host": "www.sec.gov",
+            "Host": urlsplit(self.base_url).netloc,
         }
         self.rate_limit_sleep = 0.5  # Increase delay time
-        self.max_retries = 3  # Add retry count
+        # Parsed metadata (release number, date, agencies, title) of pages already fetched, by URL
+        self.metadata: Dict[str, Dict] = {}
+        # Transport failures and server-side HTTP errors (5xx, 429) by URL. Unlike a missing page or a page
+        # without usable text, these say the host itself is struggling.
+        self.fetch_errors: Dict[str, str] = {}
 
     def get_page_content(self, url: str) -> str:
-        """Get page content with retry mechanism"""
+        """
+        Get page content with a single attempt
+
+        Retries are not done here: callers put failed pages on a deferred retry queue
+        (see src/utils/retry_queue.py) instead of sleeping inline.
+        """
         logging.info(f"Fetching URL: {url}")
         
-        for attempt in range(self.max_retries):
-            try:
-                time.sleep(self.rate_limit_sleep)
-                response = requests.get(url, headers=self.headers, timeout=30)  # Add timeout setting
-                response.raise_for_status()
-                
-                # Check content length
-                content = response.text
-                if len(content) < 100:  # If content is too short, it might not be fully loaded
-                    logging.warning(f"Content too short ({len(content)} bytes) on attempt {attempt + 1}, retrying...")
-                    continue
-                print(len(content))
-                return content
-                
-            except requests.RequestException as e:
-                if attempt < self.max_retries - 1:
-                    wait_time = (attempt + 1) * 2  # Incremental wait time
-                    logging.warning(f"Error fetching {url} on attempt {attempt + 1}: {str(e)}")
-                    logging.info(f"Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                else:
-                    logging.error(f"Failed to fetch {url} after {self.max_retries} attempts: {str(e)}")
-                    return ""
-                    
-        return ""
+        try:
+            time.sleep(self.rate_limit_sleep)
+            response = requests.get(url, headers=self.headers, timeout=30)  # Add timeout setting
+            response.raise_for_status()
+            
+            # Check content length
+            content = response.text
+            if len(content) < 100:  # If content is too short, it might not be fully loaded
+                logging.warning(f"Content too short ({len(content)} bytes) from {url}")
+                return ""
+            print(len(content))
+            return content
+            
+        except requests.RequestException as e:
+            logging.error(f"Failed to fetch {url}: {str(e)}")
+            self.record_fetch_error(url, e)
+            return ""
+
+    def open_stream(self, url: str) -> Optional[requests.Response]:
+        """
+        Open a streaming response for a document that should not be read into memory at once
+
+        The caller reads it with iter_content and closes it (the response is a context manager).
+        """
+        logging.info(f"Fetching URL: {url}")
+
+        try:
+            time.sleep(self.rate_limit_sleep)
+            response = requests.get(url, headers=self.headers, timeout=30, stream=True)
+            response.raise_for_status()
+            return response
+
+        except requests.RequestException as e:
+            logging.error(f"Failed to fetch {url}: {str(e)}")
+            self.record_fetch_error(url, e)
+            return None
+
+    def record_fetch_error(self, url: str, error: requests.RequestException):
+        response = getattr(error, "response", None)
+        status = response.status_code if response is not None else None
+        if status is None or status >= 500 or status == 429:
+            self.fetch_errors[url] = str(error)
+
+    def pop_fetch_error(self, url: str) -> Optional[str]:
+        """The transport or server error behind an empty extraction of url, if that is what caused it"""
+        return self.fetch_errors.pop(url, None)
+
+    def pop_metadata(self, url: str) -> Optional[Dict]:
+        """Metadata parsed while extracting url, so the page doesn't have to be fetched again"""
+        return self.metadata.pop(url, None)
 
     @abstractmethod
     def get_press_releases(self, year: int) -> List[Dict]:
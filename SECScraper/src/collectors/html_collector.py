@@ -4,12 +4,15 @@ from bs4 import BeautifulSoup
 from typing import List, Dict
 from html2text import html2text
 from .base_collector import BaseCollector
+from ..parsers.html_parser import HTMLParser
 from ..utils.date_utils import parse_date
 
 class HTMLCollector(BaseCollector):
     def __init__(self):
         super().__init__()
         self._processed_urls = set()
+        # Extractor used for each (year, template fingerprint)
+        self._templates: Dict[tuple, str] = {}
 
     def get_press_releases(self, year: int) -> List[Dict]:
         """Get press releases for the specified year"""
@@ -90,220 +93,294 @@ class HTMLCollector(BaseCollector):
                 return ""
 
             soup = BeautifulSoup(html, "html.parser")
+            self.metadata[url] = HTMLParser.parse_soup(soup, url)
             
-            # Define regex patterns
-            pattern_pre = re.compile(r"<p>(.*?)</p>", re.DOTALL)
+            # Find all paragraphs
+            matches = _PARAGRAPH.findall(str(soup))
             
-            # Find all matching content
-            matches = pattern_pre.findall(str(soup))
-            
-            # Store all valid paragraphs
-            paragraphs = []
-            found_header = False
-            
-            for match in matches:
-                # Process regular paragraph text
-                content = match
-                # Remove all HTML tags while preserving text content within tags
-                content = re.sub(r'<(?:em|i)>(.*?)</(?:em|i)>', r'\1', content)  # Process em and i tags
-                content = re.sub(r'<[^>]+>', '', content)  # Remove other HTML tags
-                content = content.strip()
-                
-                if content:
-                    paragraphs.append(content)
-                    if not found_header:
-                        found_header = True
-                
-                # Check if only date (em/i/b tags wrapped)
-                date_only_match = re.search(r'<(?:em|i|b)>.*?</(?:em|i|b)>\s*?(?:[—–\-â]|&mdash;|&ndash;|-){0,1,2}\s*?(.*?)(?:</?p>|<br|$)', match)
-                if date_only_match:
-                    content = re.sub(r'<[^>]+>', '', date_only_match.group(1)).strip()
-                    if content:
-                        paragraphs.append(content)
-                        found_header = True
-                        continue
-                
-                # Skip agency lists
-                if re.search(r"(?:Board of Governors.*?\n|Department of.*?\n|Federal.*?\n|Office of.*?\n|Securities.*?\n)+\d{4}-\d+\n?[--]", content):
-                    continue
-                
-                # Skip navigation links
-                if re.search(r'^Home\s*>\s*News', content):
-                    continue
-                        
-                # Skip page header information
-                if content.startswith(('FOR IMMEDIATE RELEASE', 'Modified:', 'Last modified:')):
-                    continue
-                        
-                # Skip footer links
-                if content.startswith(('Contact', 'Employment', 'Links', 'FOIA')):
-                    continue
-                
-                # If header found, continue adding subsequent paragraphs
-                if found_header:
-                    # Skip navigation links
-                    if re.search(r'^Home\s*>\s*News', content):
-                        continue
-                        
-                    # Skip page header information
-                    if content.startswith(('FOR IMMEDIATE RELEASE', 'Modified:', 'Last modified:')):
-                        continue
-                        
-                    # Skip footer links
-                    if content.startswith(('Contact', 'Employment', 'Links', 'FOIA')):
-                        continue
-                    
-                    if content and content not in paragraphs:  # Avoid duplicate paragraphs
-                        paragraphs.append(content)
-            
-            # Initialize full_text
-            full_text = "\n\n".join(paragraphs) if paragraphs else ""
-            
-            # If no Washington format content found, try other extraction methods
-            if not full_text.strip():
-                paragraphs = []
-                content_started = False
-                
-                for match in matches:
-                    # Check if table format (What/Who/When etc.)
-                    if '<table' in match and ('What:' in match or 'Who:' in match or 'When:' in match):
-                        # Extract table content
-                        table_items = []
-                        for field in ['What:', 'Who:', 'When:', 'Where:', 'Contact:', 'Other:']:
-                            field_match = re.search(rf'<td[^>]*>\s*<b[^>]*>{field}</b>\s*</td>\s*<td[^>]*>(.*?)</td>', match, re.DOTALL)
-                            if field_match:
-                                content = re.sub(r'<[^>]+>', '', field_match.group(1)).strip()
-                                if content:
-                                    table_items.append(f"{field} {content}")
-                        if table_items:
-                            paragraphs.extend(table_items)
+            # The fingerprint picks the extractor for the page template; pages of one template and year are
+            # laid out alike, so a correction made for one page is kept for the rest of them
+            key = (_year_of(url), fingerprint(html))
+            name = self._templates.get(key) or route(key[1])
+            paragraphs = _EXTRACTORS[name](matches)
+            if not paragraphs:
+                for other in _CASCADE:
+                    if other != name:
+                        paragraphs = _EXTRACTORS[other](matches)
+                        if paragraphs:
+                            name = other
                             break
-                    
-                    # Check if only date (em tag wrapped)
-                    date_only_match = re.search(r'<(?:em|i)>.*?</(?:em|i)>\s*?(?:[—–\-â]|&mdash;|&ndash;){1,2}\s*?(.*?)(?:</?p>|<br|$)', match)
-                    if date_only_match:
-                        content = re.sub(r'<[^>]+>', '', date_only_match.group(1)).strip()
-                        if content:
-                            paragraphs.append(content)
-                            found_header = True
-                            continue
-                    
-                    # Check if only date (i tag wrapped)
-                    date_only_match_i = re.search(r'<i>(?:(?:Jan|Feb|Mar|Apr|Jun(?:e)?|Jul|Aug|Sep(?:t)?|Oct|Nov|Dec)\.?|(?:January|February|March|April|May|June|July|August|September|October|November|December))\s+?\d{1,2},?\s+?\d{4}</i>\s*?(?:[—–\-â]|&mdash;|&ndash;){1,2}\s*?(.*?)(?:</?p>|<br|$)', match)
-                    if date_only_match_i:
-                        content = re.sub(r'<[^>]+>', '', date_only_match_i.group(1)).strip()
-                        if content:
-                            paragraphs.append(content)
-                            found_header = True
-                            continue
-                    
-                    # Check if only date (b tag wrapped)
-                    date_only_match_b = re.search(r'<b>.*?</b>(?:[—–\-â]|&mdash;|&ndash;|-|\s)*?(The\s+Commission.*?)(?:</?p>|<br|$)', match)
-                    if date_only_match_b:
-                        content = re.sub(r'<[^>]+>', '', date_only_match_b.group(1)).strip()
-                        if content:
-                            paragraphs.append(content)
-                            found_header = True
-                            continue
-                    
-                    # Process regular paragraph text
-                    content = match
-                    # Remove all HTML tags while preserving text content within tags
-                    content = re.sub(r'<(?:em|i)>(.*?)</(?:em|i)>', r'\1', content)  # Process em and i tags
-                    content = re.sub(r'<[^>]+>', '', content)  # Remove other HTML tags
-                    content = content.strip()
-                    
-                    # Check if contains end marker
-                    if any(mark in content for mark in ["###", "# # #", "* * *", "#  #  #", "*  *  *", "***"]):
-                        break
-                    
-                    # Skip navigation links
-                    if re.search(r'^Home\s*>\s*News', content):
-                        continue
-                        
-                    # Skip page header information
-                    if content.startswith(('FOR IMMEDIATE RELEASE', 'Modified:', 'Last modified:')):
-                        continue
-                        
-                    # Skip footer links
-                    if content.startswith(('Contact', 'Employment', 'Links', 'FOIA')):
-                        continue
-                    
-                    # If encountered h1 or h2 tag, it means the main content has started
-                    if re.search(r'<h[12][^>]*>', match):
-                        content_started = True
-                    
-                    # If content has started and is not empty, add to paragraphs
-                    if content_started and content and not content.startswith((
-                        "http://",
-                        "Home",
-                        "Previous Page",
-                        "Modified:",
-                        "Last modified:",
-                        "Contact",
-                        "Employment",
-                        "Links",
-                        "FOIA",
-                        "Forms",
-                        "Privacy"
-                    )):
-                        # If it's a new title (starts with uppercase letter), add two newlines
-                        if re.match(r'^[A-Z]', content) and len(paragraphs) > 0:
-                            paragraphs.append("")
-                        paragraphs.append(content)
-                
-                full_text = "\n\n".join(paragraphs)
-        
-            
-            # Initialize full_text
-            full_text = "\n\n".join(paragraphs) if paragraphs else ""
-            
-            # Clean webpage footer navigation links and modification dates
-            footer_patterns = [
-                r'Home\s*\|\s*Previous Page',
-                r'Modified:\s*\d{2}/\d{2}/\d{4}',
-                r'Last modified:\s*\d{2}/\d{2}/\d{4}',
-                r'http://www\.sec\.gov/.*?\.htm\s*$'
-            ]
+            self._templates[key] = name
             
-            for pattern in footer_patterns:
-                full_text = re.sub(pattern, '', full_text, flags=re.IGNORECASE)
-            
-            # Clean standard format at the beginning of press release
-            header_patterns = [
-                r'FOR IMMEDIATE RELEASE\s+\d{4}-\d+',
-                r'Washington,\s+D\.C\.,\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},\s+\d{4}\s*(?:â|–|-|\s)*',
-                r'Joint Release',
-            ]
-            
-            for pattern in header_patterns:
-                full_text = re.sub(pattern, '', full_text, flags=re.IGNORECASE)
-            
-            # Clean agency list and related content
-            agencies_pattern = r'(?:Board of Governors.*?\n|Department of.*?\n|Federal.*?\n|Office of.*?\n)+\d{4}-\d+\n?[–-]'
-            full_text = re.sub(agencies_pattern, '', full_text, flags=re.MULTILINE | re.DOTALL)
-            
-            # Clean content starting with dashes
-            full_text = re.sub(r'^.*?[–—-]', '', full_text, flags=re.MULTILINE).strip()
-            
-            # Clean content after list markers
-            full_text = re.sub(r'(?m)^[\s]*[#\*]+.*$', '', full_text)
-            
-            # Clean extra blank lines
-            full_text = re.sub(r'\n{3,}', '\n\n', full_text)
-            full_text = full_text.strip()
-            
-            # Convert to Markdown format
-            markdown_content = html2text(full_text, bodywidth=0)
-            
-            # Truncate content at end markers
-            end_marks = ["###", "# # #", "* * *", "#  #  #", "*  *  *", "***"]
-            for mark in end_marks:
-                if mark in markdown_content:
-                    markdown_content = markdown_content[:markdown_content.index(mark)]
-            
-            return markdown_content.strip()
+            return _post_process(paragraphs)
 
         except Exception as e:
             logging.error(f"Error extracting text from {url}: {str(e)}")
-            return ""
\ No newline at end of file
+            return ""
+
+
+_PARAGRAPH = re.compile(r"<p>(.*?)</p>", re.DOTALL)
+_TAG = re.compile(r'<[^>]+>')
+_YEAR_IN_URL = re.compile(r'/((?:19|20)\d{2})/')
+
+# Structural markers of the SEC page templates, looked for in the first FINGERPRINT_SIZE characters
+FINGERPRINT_SIZE = 8192
+ADVISORY_TABLE, ITALIC_DATELINE, PLAIN_DATELINE, PARAGRAPHS, HEADING_BODY = (1 << bit for bit in range(5))
+_TEMPLATE_MARKERS = (
+    (ADVISORY_TABLE, re.compile(r'<b[^>]*>\s*(?:What|Who|When):\s*</b>', re.IGNORECASE)),
+    (ITALIC_DATELINE, re.compile(r'<(?:em|i)>[A-Z][a-z]+\.?\s+\d{1,2},?\s+\d{4}</(?:em|i)>')),
+    (PLAIN_DATELINE, re.compile(r'Washington,\s+D\.C\.', re.IGNORECASE)),
+    (PARAGRAPHS, re.compile(r'<p[\s>]', re.IGNORECASE)),
+    (HEADING_BODY, re.compile(r'<h[12][\s>]', re.IGNORECASE)),
+)
+# First marker present decides the extractor; a page with none of these gets the paragraph extractor
+_ROUTES = (
+    (ADVISORY_TABLE, "table"),
+    (ITALIC_DATELINE, "dateline"),
+    (PLAIN_DATELINE, "paragraph"),
+    (HEADING_BODY, "heading"),
+)
+
+
+def fingerprint(html: str) -> int:
+    """Bitmask of the template markers found in the head of a page; pages of one template share it"""
+    head = html[:FINGERPRINT_SIZE]
+    return sum(bit for bit, marker in _TEMPLATE_MARKERS if marker.search(head))
+
+
+def route(mask: int) -> str:
+    """Name of the extractor for a template fingerprint"""
+    for bit, name in _ROUTES:
+        if mask & bit:
+            return name
+    return "paragraph"
+
+
+def _year_of(url: str) -> str:
+    match = _YEAR_IN_URL.search(url)
+    return match.group(1) if match else ""
+
+
+# Date-only paragraphs ("<em>Jan. 5, 2005</em> -- The Commission ...") of the paragraph pass
+_PARAGRAPH_DATE_ONLY = re.compile(r'<(?:em|i|b)>.*?</(?:em|i|b)>\s*?(?:[—–\-â]|&mdash;|&ndash;|-){0,1,2}\s*?(.*?)(?:</?p>|<br|$)')
+
+
+def _paragraph_pass(matches: List[str]) -> List[str]:
+    """Pages with a "Washington, D.C., <date> --" body in <p> tags: the text of every paragraph"""
+    paragraphs = []
+    for match in matches:
+        # Remove all HTML tags while preserving text content within tags
+        content = _TAG.sub('', match).strip()
+        if content:
+            paragraphs.append(content)
+        
+        # Check if only date (em/i/b tags wrapped)
+        date_only_match = _PARAGRAPH_DATE_ONLY.search(match)
+        if date_only_match:
+            content = _TAG.sub('', date_only_match.group(1)).strip()
+            if content:
+                paragraphs.append(content)
+    return paragraphs
+
+
+_ADVISORY_FIELDS = ['What:', 'Who:', 'When:', 'Where:', 'Contact:', 'Other:']
+_ADVISORY_FIELD_PATTERNS = [
+    (field, re.compile(rf'<td[^>]*>\s*<b[^>]*>{field}</b>\s*</td>\s*<td[^>]*>(.*?)</td>', re.DOTALL))
+    for field in _ADVISORY_FIELDS
+]
+_FALLBACK_DATE_ONLY = (
+    # Date only (em tag wrapped)
+    re.compile(r'<(?:em|i)>.*?</(?:em|i)>\s*?(?:[—–\-â]|&mdash;|&ndash;){1,2}\s*?(.*?)(?:</?p>|<br|$)'),
+    # Date only (i tag wrapped)
+    re.compile(r'<i>(?:(?:Jan|Feb|Mar|Apr|Jun(?:e)?|Jul|Aug|Sep(?:t)?|Oct|Nov|Dec)\.?|(?:January|February|March|April|May|June|July|August|September|October|November|December))\s+?\d{1,2},?\s+?\d{4}</i>\s*?(?:[—–\-â]|&mdash;|&ndash;){1,2}\s*?(.*?)(?:</?p>|<br|$)'),
+    # Date only (b tag wrapped)
+    re.compile(r'<b>.*?</b>(?:[—–\-â]|&mdash;|&ndash;|-|\s)*?(The\s+Commission.*?)(?:</?p>|<br|$)'),
+)
+_END_MARKS = ["###", "# # #", "* * *", "#  #  #", "*  *  *", "***"]
+_NAVIGATION = re.compile(r'^Home\s*>\s*News')
+_HEADING = re.compile(r'<h[12][^>]*>')
+_CAPITALIZED = re.compile(r'[A-Z]')
+_PAGE_FURNITURE = ('FOR IMMEDIATE RELEASE', 'Modified:', 'Last modified:', 'Contact', 'Employment', 'Links', 'FOIA')
+_NON_CONTENT_PREFIXES = ("http://", "Home", "Previous Page", "Modified:", "Last modified:", "Contact", "Employment",
+                         "Links", "FOIA", "Forms", "Privacy")
+
+
+def _advisory_fields(match: str) -> List[str]:
+    """"What: ...", "Who: ..." lines of a media advisory table, if the paragraph holds one"""
+    items = []
+    if '<table' in match and ('What:' in match or 'Who:' in match or 'When:' in match):
+        for field, pattern in _ADVISORY_FIELD_PATTERNS:
+            field_match = pattern.search(match)
+            if field_match:
+                content = _TAG.sub('', field_match.group(1)).strip()
+                if content:
+                    items.append(f"{field} {content}")
+    return items
+
+
+def _date_lead(match: str) -> str:
+    """Text following a date-only (em, i or b wrapped) opening, or "" if the paragraph has none"""
+    for pattern in _FALLBACK_DATE_ONLY:
+        date_only_match = pattern.search(match)
+        if date_only_match:
+            content = _TAG.sub('', date_only_match.group(1)).strip()
+            if content:
+                return content
+    return ""
+
+
+def _is_boilerplate(content: str) -> bool:
+    """Navigation, page header and footer lines"""
+    return bool(_NAVIGATION.search(content)) or content.startswith(_PAGE_FURNITURE)
+
+
+def _table_pass(matches: List[str]) -> List[str]:
+    """Media advisories: the fields of the What/Who/When table"""
+    for match in matches:
+        items = _advisory_fields(match)
+        if items:
+            return items
+    return []
+
+
+def _dateline_pass(matches: List[str]) -> List[str]:
+    """Pages opening with an italic dateline ("<i>Jan. 5, 2005</i> -- The Commission ..."): the body from there on"""
+    paragraphs = []
+    started = False
+    for match in matches:
+        if not started:
+            lead = _date_lead(match)
+            if lead:
+                started = True
+                paragraphs.append(lead)
+            continue
+        content = _TAG.sub('', match).strip()
+        if any(mark in content for mark in _END_MARKS):
+            break
+        if content and not _is_boilerplate(content) and not content.startswith(_NON_CONTENT_PREFIXES):
+            paragraphs.append(content)
+    return paragraphs
+
+
+def _heading_pass(matches: List[str]) -> List[str]:
+    """Pages whose body starts at an h1/h2 heading: the paragraphs from the heading on, a blank line before titles"""
+    paragraphs = []
+    content_started = False
+    for match in matches:
+        content = _TAG.sub('', match).strip()
+        if any(mark in content for mark in _END_MARKS):
+            break
+        if _HEADING.search(match):
+            content_started = True
+        if content_started and content and not _is_boilerplate(content) \
+                and not content.startswith(_NON_CONTENT_PREFIXES):
+            if _CAPITALIZED.match(content) and paragraphs:
+                paragraphs.append("")
+            paragraphs.append(content)
+    return paragraphs
+
+
+def _fallback_pass(matches: List[str]) -> List[str]:
+    """The catch-all cascade for pages no template extractor handled"""
+    paragraphs = []
+    content_started = False
+    
+    for match in matches:
+        # Check if table format (What/Who/When etc.)
+        table_items = _advisory_fields(match)
+        if table_items:
+            paragraphs.extend(table_items)
+            break
+        
+        # Check if only date (em, i or b tag wrapped)
+        date_content = _date_lead(match)
+        if date_content:
+            paragraphs.append(date_content)
+            continue
+        
+        # Process regular paragraph text
+        content = _TAG.sub('', match).strip()
+        
+        # Check if contains end marker
+        if any(mark in content for mark in _END_MARKS):
+            break
+        
+        # Skip navigation links, page header information and footer links
+        if _is_boilerplate(content):
+            continue
+        
+        # If encountered h1 or h2 tag, it means the main content has started
+        if _HEADING.search(match):
+            content_started = True
+        
+        # If content has started and is not empty, add to paragraphs
+        if content_started and content and not content.startswith(_NON_CONTENT_PREFIXES):
+            # If it's a new title (starts with uppercase letter), add two newlines
+            if _CAPITALIZED.match(content) and len(paragraphs) > 0:
+                paragraphs.append("")
+            paragraphs.append(content)
+    return paragraphs
+
+
+_EXTRACTORS = {
+    "table": _table_pass,
+    "dateline": _dateline_pass,
+    "heading": _heading_pass,
+    "paragraph": _paragraph_pass,
+    "fallback": _fallback_pass,
+}
+# Tried in order when the routed extractor finds nothing on a page
+_CASCADE = ("paragraph", "fallback")
+
+_FOOTER_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'Home\s*\|\s*Previous Page',
+    r'Modified:\s*\d{2}/\d{2}/\d{4}',
+    r'Last modified:\s*\d{2}/\d{2}/\d{4}',
+    r'http://www\.sec\.gov/.*?\.htm\s*$',
+)]
+_HEADER_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'FOR IMMEDIATE RELEASE\s+\d{4}-\d+',
+    r'Washington,\s+D\.C\.,\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},\s+\d{4}\s*(?:â|–|-|\s)*',
+    r'Joint Release',
+)]
+_AGENCY_LIST = re.compile(r'(?:Board of Governors.*?\n|Department of.*?\n|Federal.*?\n|Office of.*?\n)+\d{4}-\d+\n?[–-]',
+                          re.MULTILINE | re.DOTALL)
+_LEADING_DASH = re.compile(r'^.*?[–—-]', re.MULTILINE)
+_LIST_MARKER_LINE = re.compile(r'(?m)^[\s]*[#\*]+.*$')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def _post_process(paragraphs: List[str]) -> str:
+    """Header/footer cleanup shared by both passes, then conversion to Markdown"""
+    full_text = "\n\n".join(paragraphs) if paragraphs else ""
+    
+    # Clean webpage footer navigation links and modification dates
+    for pattern in _FOOTER_PATTERNS:
+        full_text = pattern.sub('', full_text)
+    
+    # Clean standard format at the beginning of press release
+    for pattern in _HEADER_PATTERNS:
+        full_text = pattern.sub('', full_text)
+    
+    # Clean agency list and related content
+    full_text = _AGENCY_LIST.sub('', full_text)
+    
+    # Clean content starting with dashes
+    full_text = _LEADING_DASH.sub('', full_text).strip()
+    
+    # Clean content after list markers
+    full_text = _LIST_MARKER_LINE.sub('', full_text)
+    
+    # Clean extra blank lines
+    full_text = _BLANK_LINES.sub('\n\n', full_text)
+    full_text = full_text.strip()
+    
+    # Convert to Markdown format
+    markdown_content = html2text(full_text, bodywidth=0)
+    
+    # Truncate content at end markers
+    for mark in _END_MARKS:
+        if mark in markdown_content:
+            markdown_content = markdown_content[:markdown_content.index(mark)]
+    
+    return markdown_content.strip()
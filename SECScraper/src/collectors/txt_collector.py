@@ -1,14 +1,18 @@
-import re
 import logging
+import requests
 from typing import List, Dict
 from bs4 import BeautifulSoup
 from .base_collector import BaseCollector
+from .pdf_collector import PDFCollector, is_pdf, CHUNK_SIZE
+from ..parsers.txt_parser import TXTParser
 from ..utils.date_utils import parse_date
+from ..utils.text_cleaner import clean_release_text
 
 class TXTCollector(BaseCollector):
-    def __init__(self):
+    def __init__(self, pdf_collector: PDFCollector = None):
         super().__init__()
         self._processed_urls = set()
+        self.pdf_collector = pdf_collector or PDFCollector()
 
     def get_press_releases(self, year: int) -> List[Dict]:
         """Get press releases from 1977-2001"""
@@ -72,41 +76,28 @@ class TXTCollector(BaseCollector):
     def extract_press_release_text(self, url: str) -> str:
         """Extract the main content from SEC releases in TXT format."""
         try:
-            content = self.get_page_content(url)
-            if not content:
+            response = self.open_stream(url)
+            if response is None:
+                return ""
+            with response:
+                chunks = response.iter_content(CHUNK_SIZE)
+                head = next(chunks, b"")
+                # Some releases are PDFs behind a non-.pdf URL; their bytes must not be read as text
+                if is_pdf(response.headers.get("Content-Type"), head):
+                    content = self.pdf_collector.read_text([head], chunks)
+                else:
+                    content = (head + b"".join(chunks)).decode(response.encoding or "utf-8", errors="replace")
+
+            if len(content) < 100:  # If content is too short, it might not be fully loaded
+                logging.warning(f"Content too short ({len(content)} bytes) from {url}")
                 return ""
 
-            # Use regular expression to delete from the beginning to "Washington" and the following dash
-            content = re.sub(r'^.*?Washington,?\s*?D\.?C\.?,?\s*?(?:(?:Jan|Feb|Mar|Apr|Jun(?:e)?|Jul|Aug|Sep(?:t)?|Oct|Nov|Dec)\.?|(?:January|February|March|April|May|June|July|August|September|October|November|December))\s+?\d{1,2},?\s+?\d{4}\s*?[—–-]{1,2}?\s*?', '', content, flags=re.DOTALL | re.IGNORECASE).strip()
-            
-            # Remove leading dashes and whitespace
-            content = re.sub(r'^(?:-{1,2}|—|–)\s*', '', content).strip()
-
-            # Process remaining content line by line
-            lines = content.splitlines()
-            cleaned_lines = []
-            found_separator = False
-
-            for line in lines:
-                line = line.strip()
-                if not found_separator:
-                    # Check for separator to skip
-                    if line in ['#  #  #', '*  *  *', '# # #', '* * *', '###', '***']:
-                        found_separator = True
-                        continue
-                if not found_separator:
-                    cleaned_lines.append(line)
-
-            # Join all lines into a single string
-            text = ' '.join(cleaned_lines)
-            # Remove extra whitespace
-            text = ' '.join(text.split())
-            
-            # Clean lines containing ### or *** and their following content
-            text = re.sub(r'\s*(?:[#*](?:\s*[#*]\s*){2,}).*$', '', text, flags=re.DOTALL)
-
-            return text.strip()
+            self.metadata[url] = TXTParser.parse_press_release(content, url)
+            return clean_release_text(content)
 
         except Exception as e:
             logging.error(f"Error extracting press release text from {url}: {str(e)}")
+            if isinstance(e, requests.RequestException):
+                # The connection broke while the body was streaming
+                self.record_fetch_error(url, e)
             return ""
@@ -1,32 +1,32 @@
 from bs4 import BeautifulSoup
-import re
 from typing import Optional, Dict
+from .release_metadata import HEAD_SIZE, find_release_number, find_date, find_agencies
 
 class HTMLParser:
     @staticmethod
-    def parse_press_release(html: str) -> Optional[Dict[str, str]]:
+    def parse_press_release(html: str, url: Optional[str] = None) -> Optional[Dict]:
         """Parse HTML formatted press release"""
         try:
-            soup = BeautifulSoup(html, "html.parser")
-            
-            # Get title
-            title = ""
-            h1_tag = soup.find("h1")
-            if h1_tag:
-                title = h1_tag.get_text(strip=True)
-            
-            # Get date
-            date = ""
-            date_pattern = r"\d{1,2}/\d{1,2}/\d{4}"
-            date_match = re.search(date_pattern, html)
-            if date_match:
-                date = date_match.group(0)
-            
-            return {
-                "title": title,
-                "date": date,
-            }
-            
+            return HTMLParser.parse_soup(BeautifulSoup(html, "html.parser"), url)
         except Exception as e:
             print(f"Error parsing HTML: {str(e)}")
             return None
+
+    @staticmethod
+    def parse_soup(soup: BeautifulSoup, url: Optional[str] = None) -> Dict:
+        """Release number, canonical date (YYYY-MM-DD), agencies and title of an already parsed page"""
+        # Get title
+        title = ""
+        title_tag = soup.find("h1") or soup.find("title")
+        if title_tag:
+            title = title_tag.get_text(strip=True)
+        
+        # Get release number, date and agencies from the page header
+        head = soup.get_text(" ")[:HEAD_SIZE]
+        
+        return {
+            "release_number": find_release_number(head, url),
+            "date": find_date(head),
+            "agencies": find_agencies(head),
+            "title": title,
+        }
@@ -0,0 +1,89 @@
+import re
+from typing import Dict, List, Optional
+from ..utils.date_utils import parse_date
+
+# Release metadata sits in the page header, so only the first few KB are scanned
+HEAD_SIZE = 4096
+
+# ".../news/press/2009/2009-190.htm", ".../pressarchive/1997/97-12.txt"
+_URL_RELEASE_NUMBER = re.compile(r'/(\d{2,4}-\d{1,4})\.(?:html?|txt|pdf)$', re.IGNORECASE)
+# "Release: 2009-190", "FOR IMMEDIATE RELEASE 2005-12", "Release No. 99-44"
+_TEXT_RELEASE_NUMBER = re.compile(r'RELEASE(?:\s*No\.?|:)?\s*(\d{2,4}-\d{1,4})\b', re.IGNORECASE)
+_RELEASE_NUMBER = re.compile(r'(\d{2,4})-(\d{1,4})')
+_MONTH_DATE = r'([A-Z][a-z]{2,8}\.?\s+\d{1,2},?\s+\d{4})'
+# "For Release: Sept. 1, 2009" (joint releases) or the "Washington, D.C., Jan. 5, 1999 --" dateline
+_RELEASE_DATE = re.compile(r'For Release:\s*' + _MONTH_DATE + r'|Washington,?\s*D\.?C\.?,?\s*' + _MONTH_DATE,
+                           re.IGNORECASE)
+_NUMERIC_DATE = re.compile(r'\b\d{1,2}/\d{1,2}/\d{4}\b')
+
+# Issuing agencies of joint releases, by the abbreviation stored in the index
+_AGENCIES = (
+    ("SEC", re.compile(r'Securities and Exchange Commission', re.IGNORECASE)),
+    ("CFTC", re.compile(r'Commodity Futures Trading Commission', re.IGNORECASE)),
+    ("FRB", re.compile(r'Board of Governors of the Federal Reserve|Federal Reserve Board', re.IGNORECASE)),
+    ("FDIC", re.compile(r'Federal Deposit Insurance Corporation', re.IGNORECASE)),
+    ("OCC", re.compile(r'Comptroller of the Currency', re.IGNORECASE)),
+    ("OTS", re.compile(r'Office of Thrift Supervision', re.IGNORECASE)),
+    ("TREASURY", re.compile(r'Department of the Treasury', re.IGNORECASE)),
+    ("DOJ", re.compile(r'Department of Justice', re.IGNORECASE)),
+    ("FTC", re.compile(r'Federal Trade Commission', re.IGNORECASE)),
+    ("NASD", re.compile(r'National Association of Securities Dealers|\bNASD\b')),
+    ("FINRA", re.compile(r'Financial Industry Regulatory Authority|\bFINRA\b')),
+)
+
+
+def normalize_release_number(number: str) -> str:
+    """
+    Expand two-digit years ("97-12" -> "1997-12") so numbers from every era sort and match alike
+
+    Raises ValueError for anything that is not a release number.
+    """
+    match = _RELEASE_NUMBER.fullmatch(number.strip())
+    if not match:
+        raise ValueError(f"Not a release number (expected e.g. 2009-190 or 97-12): {number!r}")
+    year, sequence = match.groups()
+    if len(year) == 2:
+        year = '19' + year if int(year) >= 77 else '20' + year
+    return f"{year}-{int(sequence)}"
+
+
+def find_release_number(head: str, url: Optional[str] = None) -> str:
+    match = _URL_RELEASE_NUMBER.search(url or "")
+    if not match:
+        match = _TEXT_RELEASE_NUMBER.search(head)
+    return normalize_release_number(match.group(1)) if match else ""
+
+
+def canonical_date(date: Optional[str]) -> str:
+    """MM/DD/YYYY (as returned by parse_date) to a sortable YYYY-MM-DD"""
+    if not date:
+        return ""
+    month, day, year = date.split('/')
+    return f"{year}-{month}-{day}"
+
+
+def find_date(head: str) -> str:
+    # The dateline is the release date; a bare MM/DD/YYYY may be a "Modified:" stamp, so it is the fallback
+    match = _RELEASE_DATE.search(head)
+    # parse_date knows "Sep." but not the SEC's usual "Sept."
+    date = parse_date(re.sub(r'^Sept\b', 'Sep', match.group(1) or match.group(2))) if match else None
+    if not date:
+        match = _NUMERIC_DATE.search(head)
+        date = parse_date(match.group(0)) if match else None
+    return canonical_date(date)
+
+
+def find_agencies(head: str) -> List[str]:
+    return [name for name, pattern in _AGENCIES if pattern.search(head)]
+
+
+def build_record(release: Dict, metadata: Optional[Dict]) -> Dict:
+    """Combine parsed page metadata with the index row, which fills in anything the page lacked"""
+    metadata = metadata or {}
+    return {
+        "release_number": metadata.get("release_number") or find_release_number("", release["URL"]),
+        "date": metadata.get("date") or canonical_date(release.get("Date")),
+        "title": metadata.get("title") or release.get("Headlines", ""),
+        "agencies": metadata.get("agencies") or [],
+        "url": release["URL"],
+    }
@@ -1,29 +1,25 @@
-import re
 from typing import Optional, Dict
+from .release_metadata import HEAD_SIZE, find_release_number, find_date, find_agencies
 
 class TXTParser:
     @staticmethod
-    def parse_press_release(content: str) -> Optional[Dict[str, str]]:
-        """Parse TXT formatted press release"""
+    def parse_press_release(content: str, url: Optional[str] = None) -> Optional[Dict]:
+        """Parse the release number, canonical date (YYYY-MM-DD), agencies and title of a TXT press release"""
         try:
+            head = content[:HEAD_SIZE]
+            
             # Get title (usually at the beginning of the file)
-            lines = content.split('\n')
             title = ""
-            for line in lines:
+            for line in head.split('\n'):
                 if line.strip() and not line.startswith(('FOR IMMEDIATE RELEASE', 'http://', 'Modified:')):
                     title = line.strip()
                     break
             
-            # Get date
-            date = ""
-            date_pattern = r"\d{1,2}/\d{1,2}/\d{4}"
-            date_match = re.search(date_pattern, content)
-            if date_match:
-                date = date_match.group(0)
-            
             return {
+                "release_number": find_release_number(head, url),
+                "date": find_date(head),
+                "agencies": find_agencies(head),
                 "title": title,
-                "date": date,
             }
             
         except Exception as e:
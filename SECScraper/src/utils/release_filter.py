@@ -0,0 +1,53 @@
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from ..parsers.release_metadata import canonical_date
+
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def parse_day(value: str) -> date:
+    """A YYYY-MM-DD day ("2009-1-5" is read as 2009-01-05); raises ValueError for anything else"""
+    return datetime.strptime(value.strip(), DAY_FORMAT).date()
+
+
+def _release_day(release: Dict) -> Optional[date]:
+    try:
+        return parse_day(canonical_date(release.get("Date")))
+    except ValueError:
+        return None
+
+
+def year_range(start_year: int, end_year: int, start_date: Optional[date] = None,
+               end_date: Optional[date] = None) -> range:
+    """Years whose index pages can hold releases in the date range"""
+    if start_date:
+        start_year = max(start_year, start_date.year)
+    if end_date:
+        end_year = min(end_year, end_date.year)
+    return range(start_year, end_year + 1)
+
+
+def filter_releases(releases: List[Dict], start_date: Optional[date] = None, end_date: Optional[date] = None,
+                    headline_pattern: Optional[str] = None, url_pattern: Optional[str] = None) -> List[Dict]:
+    """
+    Keep index rows dated start_date..end_date (inclusive) whose headline matches headline_pattern
+    (case-insensitive) and whose URL matches url_pattern
+
+    Runs on the rows returned by get_press_releases, so releases that are filtered out are never fetched.
+    Rows without a readable date are dropped when a date range is given.
+    """
+    headline = re.compile(headline_pattern, re.IGNORECASE) if headline_pattern else None
+    url = re.compile(url_pattern) if url_pattern else None
+    kept = []
+    for release in releases:
+        if start_date or end_date:
+            day = _release_day(release)
+            if day is None or (start_date and day < start_date) or (end_date and day > end_date):
+                continue
+        if headline and not headline.search(release.get("Headlines", "")):
+            continue
+        if url and not url.search(release["URL"]):
+            continue
+        kept.append(release)
+    return kept
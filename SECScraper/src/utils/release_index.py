@@ -0,0 +1,77 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+from ..parsers.release_metadata import normalize_release_number
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (
+    release_number TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    title TEXT NOT NULL,
+    agencies TEXT NOT NULL,
+    url TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS releases_by_date ON releases (date, release_number);
+"""
+_COLUMNS = ("release_number", "date", "title", "agencies", "url")
+
+
+class ReleaseIndex:
+    """
+    On-disk index of press-release metadata (no text)
+
+    Release numbers are the primary key and dates have their own B-tree index, so a lookup by number is
+    O(log n) and a date-range scan reads only the matching rows, in date order.
+    """
+
+    def __init__(self, path: str = "sec_release_index.sqlite", read_only: bool = False):
+        """With read_only, a missing index raises sqlite3.OperationalError instead of being created"""
+        self.path = path
+        if read_only:
+            self._conn = sqlite3.connect(f"{Path(path).absolute().as_uri()}?mode=ro", uri=True)
+        else:
+            self._conn = sqlite3.connect(path)
+            self._conn.executescript(_SCHEMA)
+
+    def add(self, records: Iterable[Dict]) -> int:
+        """Insert or replace records (dicts from release_metadata.build_record); returns how many were stored"""
+        rows = [(record["release_number"], record["date"], record["title"], json.dumps(record["agencies"]),
+                 record["url"]) for record in records if record.get("release_number")]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO releases VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def get(self, release_number: str) -> Optional[Dict]:
+        """The record for a release number in any accepted form, or None (also for malformed numbers)"""
+        try:
+            release_number = normalize_release_number(release_number)
+        except ValueError:
+            return None
+        row = self._conn.execute("SELECT * FROM releases WHERE release_number = ?", (release_number,)).fetchone()
+        return self._to_record(row) if row else None
+
+    def between(self, start_date: str, end_date: str) -> Iterator[Dict]:
+        """Records dated start_date..end_date inclusive (YYYY-MM-DD), oldest first"""
+        cursor = self._conn.execute("SELECT * FROM releases WHERE date BETWEEN ? AND ? ORDER BY date, release_number",
+                                    (start_date, end_date))
+        for row in cursor:
+            yield self._to_record(row)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM releases").fetchone()[0]
+
+    @staticmethod
+    def _to_record(row) -> Dict:
+        record = dict(zip(_COLUMNS, row))
+        record["agencies"] = json.loads(record["agencies"])
+        return record
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,86 @@
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FetchError(Exception):
+    """A page could not be fetched because of the connection or the server, as opposed to its content"""
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker
+
+    After failure_threshold consecutive failures a host is skipped for cooldown seconds, then a single
+    trial request is let through (half-open); a success closes the circuit again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+
+    def allow(self, host: str, now: float) -> bool:
+        return now >= self._open_until.get(host, 0.0)
+
+    def open_until(self, host: str) -> float:
+        return self._open_until.get(host, 0.0)
+
+    def record_success(self, host: str):
+        self._failures.pop(host, None)
+        self._open_until.pop(host, None)
+
+    def record_failure(self, host: str, now: float) -> bool:
+        """Record a failure and return True if it opened the circuit"""
+        self._failures[host] = self._failures.get(host, 0) + 1
+        if self._failures[host] >= self.failure_threshold:
+            self._failures[host] = self.failure_threshold - 1  # A failed half-open trial reopens immediately
+            self._open_until[host] = now + self.cooldown
+            return True
+        return False
+
+
+class RetryQueue:
+    """
+    Deferred retry queue ordered by due time, with a retry budget shared by every item
+
+    Failed items are pushed back with an exponential backoff timestamp instead of sleeping inline,
+    so healthy work keeps flowing. Items that run out of attempts or budget go to dead_letters.
+    """
+
+    def __init__(self, retry_budget: int = 200, max_attempts: int = 3, base_delay: float = 2.0,
+                 max_delay: float = 60.0):
+        self.retry_budget = retry_budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dead_letters: List[Tuple[Any, str]] = []
+        self._heap: List[Tuple[float, int, int, Any]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: Any, attempt: int, now: float, error: str = "") -> bool:
+        """Schedule another attempt; returns False (and dead-letters the item) when it may not be retried"""
+        if attempt >= self.max_attempts or self.retry_budget <= 0:
+            self.dead_letters.append((item, error))
+            return False
+        self.retry_budget -= 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        heapq.heappush(self._heap, (now + delay, next(self._counter), attempt, item))
+        return True
+
+    def defer(self, item: Any, attempt: int, until: float):
+        """Put an item aside until a given time without spending an attempt or budget (e.g. open circuit)"""
+        heapq.heappush(self._heap, (until, next(self._counter), attempt, item))
+
+    def pop_ready(self, now: float) -> Optional[Tuple[int, Any]]:
+        if self._heap and self._heap[0][0] <= now:
+            _, _, attempt, item = heapq.heappop(self._heap)
+            return attempt, item
+        return None
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
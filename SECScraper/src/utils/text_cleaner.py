@@ -0,0 +1,48 @@
+import re
+
+# Dateline such as "Washington, D.C., Jan. 5, 1999 --". A plain search finds the same (leftmost) match
+# the old '^.*?Washington...' substitution did. Every whitespace run is followed by a non-space token, so
+# the quantifiers can be possessive and a failed candidate is abandoned without backtracking.
+_DATELINE = re.compile(
+    r'Washington,?\s*+D\.?C\.?,?\s*+(?:(?:Jan|Feb|Mar|Apr|Jun(?:e)?|Jul|Aug|Sep(?:t)?|Oct|Nov|Dec)\.?|'
+    r'(?:January|February|March|April|May|June|July|August|September|October|November|December))'
+    r'\s++\d{1,2},?\s++\d{4}\s*+[—–-]',
+    re.IGNORECASE,
+)
+_LEADING_DASH = re.compile(r'(?:-{1,2}|—|–)\s*')
+_SEPARATOR_LINES = frozenset(['#  #  #', '*  *  *', '# # #', '* * *', '###', '***'])
+# Three '#'/'*' marks separated only by whitespace end the release, even in the middle of a line
+_TERMINATOR = re.compile(r'[#*]\s*[#*]\s*[#*]')
+
+
+def clean_release_text(text: str) -> str:
+    """
+    Strip the dateline header and the '###' / '***' footer from a press release and collapse whitespace
+
+    Produces the same output as the original multi-pass regex cleaner in a single scan over the text.
+    """
+    # Drop everything up to and including the "Washington, D.C., <date> --" dateline
+    match = _DATELINE.search(text)
+    if match:
+        text = text[match.end():]
+    text = text.strip()
+
+    # Remove a leading dash left over from the dateline
+    match = _LEADING_DASH.match(text)
+    if match:
+        text = text[match.end():]
+
+    # Keep words up to the first separator line
+    words = []
+    for line in text.strip().splitlines():
+        line = line.strip()
+        if line in _SEPARATOR_LINES:
+            break
+        words.extend(line.split())
+    text = ' '.join(words)
+
+    # Cut at an inline terminator such as "... end of release. # # #"
+    match = _TERMINATOR.search(text)
+    if match:
+        text = text[:match.start()]
+    return text.strip()
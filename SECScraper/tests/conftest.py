@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper imports its modules as `src.*` from SECScraper/; put that on the path so the tests run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,71 @@
+import pytest
+
+from src.collectors import html_collector
+from src.collectors.html_collector import HTMLCollector, fingerprint, route
+
+ADVISORY_PAGE = """<html><body>
+<p>Home > News</p>
+<p>Media Advisory<table>
+<tr><td><b>What:</b></td><td>Open meeting on market structure</td></tr>
+<tr><td><b>When:</b></td><td>10 a.m., March 3, 2005</td></tr>
+</table></p>
+</body></html>"""
+
+DATELINE_PAGE = """<html><body>
+<p>Home > News</p>
+<p><i>March 3, 2005</i> &mdash; The Commission today adopted new rules.</p>
+<p>The rules take effect in 60 days.</p>
+<p>Contact: Office of Public Affairs</p>
+</body></html>"""
+
+HEADING_PAGE = """<html><body>
+<p>Home > News</p>
+<p><h1>Commission Announces Agenda</h1></p>
+<p>The agenda is available online.</p>
+<p>###</p>
+</body></html>"""
+
+
+@pytest.fixture
+def paragraph_calls(monkeypatch):
+    calls = []
+
+    def spy(matches):
+        calls.append(matches)
+        return html_collector._paragraph_pass(matches)
+
+    monkeypatch.setitem(html_collector._EXTRACTORS, "paragraph", spy)
+    return calls
+
+
+def _extract(page, url):
+    collector = HTMLCollector()
+    collector.get_page_content = lambda _: page
+    return collector, collector.extract_press_release_text(url)
+
+
+@pytest.mark.parametrize("page, template, expected", [
+    (ADVISORY_PAGE, "table", "What: Open meeting on market structure"),
+    (DATELINE_PAGE, "dateline", "The Commission today adopted new rules."),
+    (HEADING_PAGE, "heading", "Commission Announces Agenda"),
+])
+def test_template_pages_skip_paragraph_pass(paragraph_calls, page, template, expected):
+    url = "https://www.sec.gov/news/press/2005/2005-31.htm"
+    collector, text = _extract(page, url)
+
+    assert route(fingerprint(page)) == template
+    assert expected in text
+    assert "Home > News" not in text
+    assert paragraph_calls == []
+    assert collector._templates == {("2005", fingerprint(page)): template}
+
+
+def test_empty_template_extractor_falls_back_and_is_remembered(paragraph_calls):
+    # An italic date that is not a dateline: the dateline extractor finds nothing, the paragraph pass does
+    page = "<html><body><p>Updated <i>March 3, 2005</i></p><p>Washington, D.C. notice.</p></body></html>"
+    url = "https://www.sec.gov/news/press/2005/2005-32.htm"
+    collector, text = _extract(page, url)
+
+    assert "notice" in text
+    assert len(paragraph_calls) == 1
+    assert collector._templates[("2005", fingerprint(page))] == "paragraph"
@@ -0,0 +1,73 @@
+# bench_startup.py
+"""Startup-time budget for cli.py.
+
+Runs short invocations under `python -X importtime`, reports the slowest top-level imports and exits
+non-zero when any invocation goes over the import or wall-clock budget. Run it after adding a
+subcommand or a module-level import.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(ROOT, 'cli.py')
+COMMANDS = [
+    ['--help'],
+    ['sec', '--help'],
+    ['transcript', '--help'],
+    ['ticker', '--help'],
+    ['lookup', 'AMZN'],
+]
+
+
+def parse_importtime(stderr):
+    # Lines look like "import time:  self [us] | cumulative | imported package", nesting shown by indentation
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):
+            top_level.append((int(cumulative), name.strip()))
+    return top_level
+
+
+def measure(command, cwd):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', CLI] + command, cwd=cwd,
+                            capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    imports = parse_importtime(result.stderr)
+    return wall_ms, sum(us for us, _ in imports) / 1000, sorted(imports, reverse=True)[:5]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--import-budget-ms', type=float, default=150.0)
+    parser.add_argument('--wall-budget-ms', type=float, default=500.0)
+    args = parser.parse_args()
+
+    over_budget = False
+    with tempfile.TemporaryDirectory() as cwd:
+        # A seeded symbol index so 'lookup' measures the cached path instead of a network call
+        os.makedirs(os.path.join(cwd, '.cache'))
+        with open(os.path.join(cwd, '.cache', 'symbols.json'), 'w', encoding='utf-8') as f:
+            json.dump([{'symbol': 'AMZN', 'name': 'Amazon.com Inc', 'aliases': []}], f)
+
+        for command in COMMANDS:
+            wall_ms, import_ms, slowest = measure(command, cwd)
+            ok = import_ms <= args.import_budget_ms and wall_ms <= args.wall_budget_ms
+            over_budget = over_budget or not ok
+            print(f"{'ok  ' if ok else 'SLOW'} cli.py {' '.join(command):<20} wall {wall_ms:7.1f} ms  imports {import_ms:7.1f} ms")
+            if not ok:
+                for us, name in slowest:
+                    print(f"       {us / 1000:7.1f} ms  {name}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
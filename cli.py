@@ -0,0 +1,170 @@
+# cli.py
+"""One entry point for every scraper in this repository.
+
+Only argparse is imported up front; each subcommand adds its project folder to sys.path and imports
+that project's modules (and their heavy dependencies) when it runs. Check the startup cost with
+bench_startup.py.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _use_project(name):
+    # The projects are plain script folders with their own top-level modules (main, config, src)
+    sys.path.insert(0, os.path.join(ROOT, name))
+
+
+def _day(value):
+    # argparse type for YYYY-MM-DD options; normalises "2009-1-5" to "2009-01-05"
+    from datetime import datetime
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a YYYY-MM-DD date, got {value!r}")
+
+
+def run_sec(args):
+    _use_project('SECScraper')
+    import main as sec_main
+    sec_main.main(args.start_year, args.end_year, args.output, args.index, args.date_from, args.date_to,
+                  args.headline, args.url_pattern)
+
+
+def run_sec_release(args):
+    _use_project('SECScraper')
+    from src.parsers.release_metadata import normalize_release_number
+    from src.utils.release_index import ReleaseIndex
+    if args.release_number:
+        try:
+            normalize_release_number(args.release_number)
+        except ValueError as e:
+            print(e)
+            return 2
+    if not os.path.exists(args.index):
+        # A lookup must not leave an empty index behind
+        print(f"No release index at {args.index}; the sec command builds it")
+        return 1
+    with ReleaseIndex(args.index, read_only=True) as index:
+        if args.release_number:
+            records = [record for record in [index.get(args.release_number)] if record]
+        else:
+            records = index.between(args.date_from or '0000-00-00', args.date_to or '9999-12-31')
+        found = False
+        for record in records:
+            found = True
+            print(f"{record['release_number']}\t{record['date']}\t{','.join(record['agencies'])}\t"
+                  f"{record['title']}\t{record['url']}")
+    if not found:
+        print("No matching releases")
+        return 1
+
+
+def run_sec_crawl4ai(args):
+    _use_project('SECScraper')
+    import asyncio
+    import main_crawl4ai
+    asyncio.run(main_crawl4ai.main())
+
+
+def run_transcript(args):
+    _use_project('seekingAlphaScraper')
+    import main as transcript_main
+    for transcript_id in args.transcript_ids:
+        transcript_main.save_transcript(transcript_id)
+
+
+def run_transcript_service(args):
+    _use_project('seekingAlphaScraper')
+    import uvicorn
+    from service import app
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+def run_ticker(args, extra):
+    _use_project('tickerDataMiner')
+    import run
+    run.main(extra)
+
+
+def run_lookup(args):
+    _use_project('tickerDataMiner')
+    from run import validate_ticker
+    from src.symbol_index import SymbolIndex
+    try:
+        validate_ticker(args.query, SymbolIndex())
+    except ValueError as e:
+        print(e)
+        return 1
+
+
+def run_features(args, extra):
+    _use_project('tickerDataMiner')
+    from src.features import main as features_main
+    features_main(extra)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="scrapIntern scrapers")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sec = subparsers.add_parser('sec', help="Collect SEC press releases into a CSV")
+    sec.add_argument('--start-year', type=int, default=1997)
+    sec.add_argument('--end-year', type=int, default=2011)
+    sec.add_argument('--output', default='sec_press_releases.csv')
+    sec.add_argument('--index', default='sec_release_index.sqlite', help="Release metadata index to update")
+    # Filters are applied to the yearly index rows, so releases they exclude are never downloaded
+    sec.add_argument('--from', dest='date_from', type=_day,
+                     help="Only releases dated on or after this day (YYYY-MM-DD)")
+    sec.add_argument('--to', dest='date_to', type=_day, help="Only releases dated on or before this day (YYYY-MM-DD)")
+    sec.add_argument('--headline', help="Only releases whose headline matches this regex (case-insensitive)")
+    sec.add_argument('--url-pattern', help="Only releases whose URL matches this regex")
+    sec.set_defaults(handler=run_sec)
+
+    release = subparsers.add_parser('sec-release', help="Look up SEC releases in the metadata index")
+    release.add_argument('release_number', nargs='?', help="e.g. 2009-190 or 97-12")
+    release.add_argument('--from', dest='date_from', type=_day, help="Start date (YYYY-MM-DD)")
+    release.add_argument('--to', dest='date_to', type=_day, help="End date (YYYY-MM-DD)")
+    release.add_argument('--index', default='sec_release_index.sqlite')
+    release.set_defaults(handler=run_sec_release)
+
+    crawl = subparsers.add_parser('sec-crawl4ai', help="Experimental crawl4ai-based SEC collection")
+    crawl.set_defaults(handler=run_sec_crawl4ai)
+
+    transcript = subparsers.add_parser('transcript', help="Download Seeking Alpha transcripts as markdown")
+    transcript.add_argument('transcript_ids', nargs='+')
+    transcript.set_defaults(handler=run_transcript)
+
+    service = subparsers.add_parser('transcript-service', help="Serve cached Seeking Alpha transcripts over HTTP")
+    service.add_argument('--host', default='127.0.0.1')
+    service.add_argument('--port', type=int, default=8000)
+    service.set_defaults(handler=run_transcript_service)
+
+    ticker = subparsers.add_parser('ticker', help="tickerDataMiner run.py (pass its options after the subcommand)",
+                                   add_help=False)
+    ticker.set_defaults(passthrough=run_ticker)
+
+    lookup = subparsers.add_parser('lookup', help="Resolve a company name or ticker to its symbol")
+    lookup.add_argument('query')
+    lookup.set_defaults(handler=run_lookup)
+
+    features = subparsers.add_parser('features', help="tickerDataMiner text feature extraction", add_help=False)
+    features.set_defaults(passthrough=run_features)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    # ticker and features hand everything after the subcommand to the project's own parser
+    args, extra = parser.parse_known_args(argv)
+    if hasattr(args, 'passthrough'):
+        return args.passthrough(args, extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
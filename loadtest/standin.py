@@ -0,0 +1,189 @@
+# standin.py
+"""Local record/replay HTTP stand-in for the scrapers' upstream APIs.
+
+record: proxy every request to --upstream and save the responses into a cassette directory.
+replay: serve the saved responses with configurable latency, jitter, error rate and 429 throttling.
+
+Run one instance per upstream (sec.gov, RapidAPI, Reddit, Alpha Vantage) on its own port and point
+the scrapers at it through their *_URL environment variables (see loadtest/README.md).
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Credentials are never written to a cassette or made part of its key, so recordings replay with any key
+SECRET_PARAMS = {'apikey', 'api_key', 'key', 'token'}
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'content-encoding', 'content-length', 'host'}
+# Ask upstream for identity encoding so cassettes hold plain bodies
+NOT_FORWARDED_HEADERS = HOP_BY_HOP_HEADERS | {'accept-encoding'}
+
+
+def _public_params(query):
+    return [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS]
+
+
+def redact_path(path):
+    """The request path with SECRET_PARAMS dropped from its query string"""
+    parts = urlsplit(path)
+    query = urlencode(_public_params(parts.query))
+    return f"{parts.path}?{query}" if query else parts.path
+
+
+def cassette_key(method, path, body=b''):
+    parts = urlsplit(path)
+    query = urlencode(sorted(_public_params(parts.query)))
+    return hashlib.sha1(f"{method} {parts.path}?{query}".encode('utf-8') + body).hexdigest()
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'StandIn/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.options.verbose:
+            super().log_message(format, *args)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(status)
+
+    def _handle(self):
+        body = self._body()
+        key = cassette_key(self.command, self.path, body)
+        path = os.path.join(self.server.options.cassette, f"{key}.json")
+        if self.server.options.mode == 'record':
+            self._record(path, body)
+        else:
+            self._replay(path)
+
+    def _record(self, path, body):
+        options = self.server.options
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in NOT_FORWARDED_HEADERS}
+        request = urllib.request.Request(options.upstream.rstrip('/') + self.path, data=body or None,
+                                         headers=headers, method=self.command)
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                status, response_headers, content = response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            status, response_headers, content = e.code, e.headers, e.read()
+        except (urllib.error.URLError, OSError) as e:
+            self._send(502, str(e).encode('utf-8'), {'Content-Type': 'text/plain'})
+            return
+
+        saved_headers = {name: value for name, value in response_headers.items()
+                         if name.lower() not in HOP_BY_HOP_HEADERS}
+        # Server errors and throttling are transient; replaying them would fail every later run
+        if status < 500 and status != 429:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'method': self.command, 'path': redact_path(self.path), 'status': status,
+                           'headers': saved_headers,
+                           'body': base64.b64encode(content).decode('ascii')}, f)
+        self._send(status, content, saved_headers)
+
+    def _replay(self, path):
+        options = self.server.options
+        delay = max(0.0, random.gauss(options.latency_ms, options.jitter_ms)) / 1000.0
+        time.sleep(delay)
+        if self.server.bucket and not self.server.bucket.take():
+            self._send(429, b'Too Many Requests', {'Content-Type': 'text/plain', 'Retry-After': '1'})
+            return
+        if random.random() < options.error_rate:
+            self._send(random.choice((500, 502, 503)), b'Injected error', {'Content-Type': 'text/plain'})
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._send(404, f"No recording for {self.command} {self.path}".encode('utf-8'),
+                       {'Content-Type': 'text/plain'})
+            return
+        self._send(entry['status'], base64.b64decode(entry['body']), entry['headers'])
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, options):
+        super().__init__((options.host, options.port), StandInHandler)
+        self.options = options
+        self.bucket = TokenBucket(options.rate_limit, options.burst or options.rate_limit) if options.rate_limit else None
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    def count(self, status):
+        with self._stats_lock:
+            self.stats[status] = self.stats.get(status, 0) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay HTTP stand-in for offline load tests")
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('--cassette', required=True, help="Directory holding the recorded responses")
+    parser.add_argument('--upstream', help="Real base URL to record from, e.g. https://www.sec.gov")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Mean added latency per response (replay)")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Standard deviation of the added latency (replay)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of responses replaced by 5xx (replay)")
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help="Requests per second before answering 429, 0 disables throttling (replay)")
+    parser.add_argument('--burst', type=float, default=0.0, help="Token bucket size for --rate-limit (default: one second)")
+    parser.add_argument('--verbose', action='store_true')
+    options = parser.parse_args()
+    if options.mode == 'record' and not options.upstream:
+        parser.error("record mode needs --upstream")
+
+    os.makedirs(options.cassette, exist_ok=True)
+    server = StandInServer(options)
+    print(f"{options.mode} stand-in listening on http://{options.host}:{options.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Responses by status: {dict(sorted(server.stats.items()))}")
+
+
+if __name__ == "__main__":
+    main()
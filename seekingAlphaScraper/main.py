@@ -1,47 +1,73 @@
 import http.client
 import json
 import os
-from dotenv import load_dotenv
-import html2text
-from datetime import datetime
+from urllib.parse import urlsplit
 
-# Load API key from environment variable
-load_dotenv()
-api_key = os.getenv('RAPIDAPI_KEY')
+API_HOST = "seeking-alpha.p.rapidapi.com"
 
-conn = http.client.HTTPSConnection("seeking-alpha.p.rapidapi.com")
 
-headers = {
-    'x-rapidapi-key': api_key,
-    'x-rapidapi-host': "seeking-alpha.p.rapidapi.com"
-}
+def create_connection():
+    # SEEKING_ALPHA_API_URL can point at a local stand-in (see loadtest/) for offline benchmarks
+    api_url = urlsplit(os.getenv('SEEKING_ALPHA_API_URL', f'https://{API_HOST}'))
+    connection_class = http.client.HTTPConnection if api_url.scheme == 'http' else http.client.HTTPSConnection
+    return connection_class(api_url.netloc)
 
-transcript_id = "4740729"  # Replace with the actual transcript ID
-try:
-    conn.request("GET", f"/transcripts/v2/get-details?id={transcript_id}", headers=headers)
+
+def get_headers():
+    # Load API key from environment variable
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        'x-rapidapi-key': os.getenv('RAPIDAPI_KEY'),
+        'x-rapidapi-host': API_HOST
+    }
+
+
+def html_to_markdown(html_content):
+    import html2text
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    h.body_width = 0  # Disable line wrapping
+    return h.handle(html_content)
+
+
+def fetch_transcript(transcript_id, conn):
+    conn.request("GET", f"/transcripts/v2/get-details?id={transcript_id}", headers=get_headers())
     res = conn.getresponse()
     data = res.read()
-    
+
     # Parse JSON response
     json_data = json.loads(data.decode('utf-8'))
     html_content = json_data['data']['attributes']['content']
-    
+
     # Convert HTML to Markdown Format
-    h = html2text.HTML2Text()
-    h.ignore_links = False
-    h.body_width = 0  # Disable line wrapping
-    markdown_content = h.handle(html_content)
-    
-    # Generate filename with transcript ID
-    filename = f"transcript_{transcript_id}.txt"
-    
-    # Save to file
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(markdown_content)
-    
-    print(f"Transcript has been saved to {filename}")
-        
-except Exception as e:
-    print(f"Error occurred: {str(e)}")
-finally:
-    conn.close()
\ No newline at end of file
+    return html_to_markdown(html_content)
+
+
+def save_transcript(transcript_id):
+    conn = create_connection()
+    try:
+        markdown_content = fetch_transcript(transcript_id, conn)
+
+        # Generate filename with transcript ID
+        filename = f"transcript_{transcript_id}.txt"
+
+        # Save to file
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(markdown_content)
+
+        print(f"Transcript has been saved to {filename}")
+        return filename
+
+    except Exception as e:
+        print(f"Error occurred: {str(e)}")
+    finally:
+        conn.close()
+
+
+def main(transcript_id="4740729"):  # Replace with the actual transcript ID
+    save_transcript(transcript_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import re
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from main import API_HOST, get_headers, html_to_markdown
+
+API_URL = os.getenv('SEEKING_ALPHA_API_URL', f'https://{API_HOST}')
+CACHE_DIR = os.getenv('TRANSCRIPT_CACHE_DIR', 'transcripts')
+MEMORY_CACHE_SIZE = int(os.getenv('TRANSCRIPT_MEMORY_CACHE_SIZE', '256'))  # Transcripts kept in memory
+MAX_UPSTREAM_CONNECTIONS = int(os.getenv('TRANSCRIPT_MAX_UPSTREAM_CONNECTIONS', '10'))
+LIST_CACHE_SECONDS = 3600  # How long a symbol's transcript list is reused
+
+_TRANSCRIPT_ID = re.compile(r'^\d+$')
+
+
+class TranscriptStore:
+    """
+    Markdown transcripts behind an in-memory LRU and a disk cache, with single-flight upstream fetches
+
+    A transcript never changes once published, so cached copies are kept for good and only misses spend
+    upstream quota. Concurrent requests for the same missing transcript share one upstream call.
+    """
+
+    def __init__(self, client, cache_dir=CACHE_DIR, memory_size=MEMORY_CACHE_SIZE):
+        self.client = client
+        self.cache_dir = cache_dir
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._in_flight = {}
+        self._lists = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, transcript_id):
+        return os.path.join(self.cache_dir, f"transcript_{transcript_id}.md")
+
+    def _remember(self, transcript_id, markdown):
+        self._memory[transcript_id] = markdown
+        self._memory.move_to_end(transcript_id)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def get(self, transcript_id):
+        if transcript_id in self._memory:
+            self._memory.move_to_end(transcript_id)
+            return self._memory[transcript_id]
+        # The first request for a missing transcript starts the load, the others await the same task
+        task = self._in_flight.get(transcript_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(transcript_id))
+            self._in_flight[transcript_id] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(transcript_id, None))
+        # shield: a client disconnecting must not cancel the load for everyone waiting on it
+        return await asyncio.shield(task)
+
+    async def _load(self, transcript_id):
+        markdown = await asyncio.to_thread(self._read_disk, transcript_id)
+        if markdown is None:
+            response = await self.client.get('/transcripts/v2/get-details', params={'id': transcript_id})
+            _raise_for_upstream(response)
+            html_content = response.json()['data']['attributes']['content']
+            # html2text is CPU bound, so it runs off the event loop
+            markdown = await asyncio.to_thread(html_to_markdown, html_content)
+            await asyncio.to_thread(self._write_disk, transcript_id, markdown)
+        self._remember(transcript_id, markdown)
+        return markdown
+
+    def _read_disk(self, transcript_id):
+        try:
+            with open(self._path(transcript_id), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, transcript_id, markdown):
+        path = self._path(transcript_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(markdown)
+        os.replace(tmp_path, path)
+
+    async def list_for_symbol(self, symbol, size=20):
+        """Transcript ids, titles and dates for a symbol, newest first; cached for LIST_CACHE_SECONDS"""
+        key = (symbol.lower(), size)
+        loop = asyncio.get_running_loop()
+        entry = self._lists.get(key)  # [loaded_at or None while loading, task]
+        if entry is None or (entry[0] is not None and loop.time() - entry[0] >= LIST_CACHE_SECONDS):
+            entry = [None, asyncio.ensure_future(self._load_list(symbol.lower(), size))]
+            self._lists[key] = entry
+
+            def done(task, entry=entry):
+                if task.cancelled() or task.exception() is not None:
+                    if self._lists.get(key) is entry:
+                        del self._lists[key]
+                else:
+                    entry[0] = loop.time()
+
+            entry[1].add_done_callback(done)
+        return await asyncio.shield(entry[1])
+
+    async def _load_list(self, symbol, size):
+        response = await self.client.get('/transcripts/v2/list', params={'id': symbol, 'size': size, 'number': 1})
+        _raise_for_upstream(response)
+        return [{'id': item['id'], 'title': item.get('attributes', {}).get('title'),
+                 'published': item.get('attributes', {}).get('publishOn')}
+                for item in response.json().get('data', [])]
+
+    def search(self, query, limit=20):
+        """Transcripts in the disk cache that contain query (case-insensitive), with a snippet around the match"""
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        results = []
+        for name in sorted(os.listdir(self.cache_dir)):
+            match = re.fullmatch(r'transcript_(\d+)\.md', name)
+            if not match:
+                continue
+            with open(os.path.join(self.cache_dir, name), 'r', encoding='utf-8') as f:
+                text = f.read()
+            found = pattern.search(text)
+            if found:
+                start, end = max(found.start() - 80, 0), min(found.end() + 80, len(text))
+                results.append({'id': match.group(1), 'snippet': ' '.join(text[start:end].split())})
+                if len(results) >= limit:
+                    break
+        return results
+
+
+def _raise_for_upstream(response):
+    if response.status_code == 404:
+        raise HTTPException(status_code=404, detail="Transcript not found upstream")
+    if response.status_code == 429:
+        raise HTTPException(status_code=503, detail="Upstream quota exhausted, try again later")
+    if response.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"Upstream returned {response.status_code}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    limits = httpx.Limits(max_connections=MAX_UPSTREAM_CONNECTIONS)
+    headers = {name: value for name, value in get_headers().items() if value}
+    async with httpx.AsyncClient(base_url=API_URL, headers=headers, limits=limits, timeout=30) as client:
+        app.state.store = TranscriptStore(client)
+        yield
+
+
+app = FastAPI(title="Seeking Alpha transcripts", lifespan=lifespan)
+
+
+@app.get('/transcripts/{transcript_id}', response_class=PlainTextResponse)
+async def get_transcript(transcript_id: str):
+    if not _TRANSCRIPT_ID.match(transcript_id):
+        raise HTTPException(status_code=400, detail="Transcript ids are numeric")
+    markdown = await app.state.store.get(transcript_id)
+    return PlainTextResponse(markdown, media_type='text/markdown; charset=utf-8')
+
+
+@app.get('/transcripts')
+async def list_transcripts(symbol: str, size: int = Query(20, ge=1, le=40)):
+    return await app.state.store.list_for_symbol(symbol, size)
+
+
+@app.get('/search')
+async def search_transcripts(q: str = Query(..., min_length=2), limit: int = Query(20, ge=1, le=100)):
+    # Searches transcripts already fetched, so it costs no upstream quota
+    return await asyncio.to_thread(app.state.store.search, q, limit)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.getenv('HOST', '127.0.0.1'), port=int(os.getenv('PORT', '8000')))
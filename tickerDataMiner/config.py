@@ -1,9 +1,44 @@
 # config.py
-REDDIT_LIMIT = 100  # The maximum number of Reddit submissions to retrieve for each search term
+import os
+
+REDDIT_LIMIT = 100  # Upper bound on Reddit submissions retrieved per search term (across all subreddits)
 TIME_RANGE_DAYS = 30  # The number of days to go back when searching for Reddit submissions
+REDDIT_INFO_BATCH_SIZE = 100  # Submissions resolved per /api/info request (Reddit caps this at 100)
+REDDIT_MAX_WORKERS = 4  # Comment trees loaded concurrently
+REDDIT_MORE_REQUESTS_PER_THREAD = 32  # "Load more comments" expansions allowed per submission
 YAHOO_MAX_COMMENTS = 300  # The maximum number of Yahoo Finance comments to retrieve
+YAHOO_MAX_CONNECTIONS = 3  # Comment pages prefetched concurrently, one connection each
 ALPHA_VANTAGE_API_KEY = ""
+NEWS_CACHE_TTL_SECONDS = 3600  # How long a cached news feed is reused before calling the API again
+NEWS_POLL_CACHE_TTL_SECONDS = 900  # The same for --poll mode, where fresher feeds are worth more quota
+NEWS_BACKFILL_WINDOW_DAYS = 30  # Length of each time window requested by a news backfill
+NEWS_BACKFILL_LIMIT = 1000  # Articles requested per window (the API maximum)
+NEWS_BACKFILL_WORKERS = 2  # Windows fetched concurrently, still paced by the Alpha Vantage quota
+CACHE_DIR = ".cache"  # On-disk cache for API responses
+SYMBOL_INDEX_FILE = ".cache/symbols.json"  # Resolved symbols, company names and Yahoo message board IDs
 REDDIT_CLIENT_ID = ""
 REDDIT_CLIENT_SECRET = ""
 REDDIT_USER_AGENT = "reddit_scraper:v1.0"
 YAHOO_API_KEY = ""
+# Rate limits used by the watchlist scheduler (a daily limit of None means unlimited)
+REDDIT_CALLS_PER_MINUTE = 100
+REDDIT_CALLS_PER_DAY = None
+YAHOO_CALLS_PER_MINUTE = 60
+YAHOO_CALLS_PER_DAY = None
+ALPHA_VANTAGE_CALLS_PER_MINUTE = 5
+ALPHA_VANTAGE_CALLS_PER_DAY = 25
+OUTPUT_FORMAT = "jsonl"  # txt (human-readable), jsonl or parquet (requires pyarrow)
+PARQUET_ROW_GROUP_SIZE = 1000  # Records buffered before each Parquet row group is written
+FEATURE_BATCH_SIZE = 50000  # Items normalised and hashed per vectorised pass
+FEATURE_HASH_SIZE = 2 ** 18  # Columns in the hashed feature matrix
+SENTIMENT_BUCKET_SECONDS = 3600  # Width of one sentiment aggregation bucket
+SENTIMENT_WINDOW_BUCKETS = 24  # Buckets covered by the rolling sentiment and volume
+PACK_TOKEN_BUDGET = 8000  # Tokens per packed batch, i.e. per model call
+PACK_ENCODING = "cl100k_base"  # tiktoken encoding used to count tokens when tiktoken is installed
+POLL_INTERVAL_SECONDS = 300  # Pause between polls in --poll mode
+CURSOR_FILE = ".cache/cursors.json"  # Newest item already collected per ticker and source
+# Upstream endpoints; override through the environment to run against a local stand-in (see loadtest/)
+ALPHA_VANTAGE_API_URL = os.getenv("ALPHA_VANTAGE_API_URL", "https://www.alphavantage.co/query")
+YAHOO_API_URL = os.getenv("YAHOO_API_URL", "https://yh-finance.p.rapidapi.com")
+REDDIT_API_URL = os.getenv("REDDIT_API_URL", "https://oauth.reddit.com")
+REDDIT_AUTH_URL = os.getenv("REDDIT_AUTH_URL", "https://www.reddit.com")
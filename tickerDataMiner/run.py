@@ -1,39 +1,225 @@
 # run.py
-import requests
-from config import ALPHA_VANTAGE_API_KEY
-from src.reddit_scraper import fetch_reddit_discussions
-from src.alpha_vantage import fetch_news_sentiments
-from src.yahoo_scraper import fetch_yahoo_comments
+import argparse
+import math
+import os
+import time
+from datetime import datetime
+from config import ALPHA_VANTAGE_API_KEY, ALPHA_VANTAGE_API_URL, YAHOO_MAX_COMMENTS, REDDIT_CALLS_PER_MINUTE, REDDIT_CALLS_PER_DAY, \
+    YAHOO_CALLS_PER_MINUTE, YAHOO_CALLS_PER_DAY, ALPHA_VANTAGE_CALLS_PER_MINUTE, ALPHA_VANTAGE_CALLS_PER_DAY, \
+    POLL_INTERVAL_SECONDS, NEWS_POLL_CACHE_TTL_SECONDS
+from src.symbol_index import SymbolIndex
 
+# The scrapers pull in praw, requests and yahoofinancials, so they are imported only once a run needs them
 
-def validate_ticker(ticker):
-    url = f'https://www.alphavantage.co/query?function=SYMBOL_SEARCH&keywords={ticker}&apikey={ALPHA_VANTAGE_API_KEY}'
-    r = requests.get(url)
+SUBREDDITS = ['stocks', 'investing', 'wallstreetbets', 'ValueInvesting']
+
+
+def validate_ticker(ticker, symbol_index, session=None):
+    symbol = symbol_index.lookup(ticker)
+    if symbol:
+        print(symbol)
+        return symbol
+
+    import requests
+    params = {'function': 'SYMBOL_SEARCH', 'keywords': ticker, 'apikey': ALPHA_VANTAGE_API_KEY}
+    r = (session or requests).get(ALPHA_VANTAGE_API_URL, params=params)
     data = r.json()
     if 'bestMatches' in data and data['bestMatches']:
-        print(data['bestMatches'][0]['1. symbol'])
-        return data['bestMatches'][0]['1. symbol']
+        for match in data['bestMatches']:
+            symbol_index.add(match['1. symbol'], match['2. name'])
+        symbol = data['bestMatches'][0]['1. symbol']
+        symbol_index.add(symbol, aliases=[ticker])
+        symbol_index.save()
+        print(symbol)
+        return symbol
     else:
         raise ValueError("Invalid ticker symbol")
 
 
-def main():
-    ticker = input("Enter the stock ticker: ")
+def load_watchlist(watchlist_file):
+    with open(watchlist_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def create_quotas():
+    from src.scheduler import SourceQuota
+    return {
+        'reddit': SourceQuota(REDDIT_CALLS_PER_MINUTE, REDDIT_CALLS_PER_DAY),
+        'yahoo': SourceQuota(YAHOO_CALLS_PER_MINUTE, YAHOO_CALLS_PER_DAY),
+        'alpha_vantage': SourceQuota(ALPHA_VANTAGE_CALLS_PER_MINUTE, ALPHA_VANTAGE_CALLS_PER_DAY),
+    }
+
+
+def resolve_tickers(entries, symbol_index, session, quota):
+    tickers = []
+    for entry in entries:
+        # Symbol lookups that miss the local index spend Alpha Vantage quota too
+        if symbol_index.lookup(entry) is None and not quota.acquire():
+            print(f"alpha_vantage: daily quota exhausted, cannot validate {entry}")
+            continue
+        try:
+            ticker = validate_ticker(entry, symbol_index, session)
+        except ValueError as e:
+            print(f"{entry}: {e}")
+            continue
+        if ticker not in tickers:
+            tickers.append(ticker)
+    return tickers
+
+
+def _poll_reddit(ticker, output_file, reddit, cursors):
+    from src.reddit_scraper import fetch_reddit_discussions
+    newest = fetch_reddit_discussions(SUBREDDITS, [ticker], output_file, reddit,
+                                      since_utc=cursors.get(ticker, 'reddit'), append=True)
+    if newest:
+        cursors.set(ticker, 'reddit', newest)
+
+
+def _poll_news(ticker, output_file, session, cursors):
+    from src.alpha_vantage import fetch_news_sentiments
+    newest = fetch_news_sentiments(ticker, output_file, session, since=cursors.get(ticker, 'alpha_vantage'),
+                                   append=True, ttl_seconds=NEWS_POLL_CACHE_TTL_SECONDS)
+    if newest:
+        cursors.set(ticker, 'alpha_vantage', newest)
+
+
+def _poll_yahoo(ticker, output_file, symbol_index, pool, cursors):
+    from src.yahoo_scraper import fetch_yahoo_comments
+    newest = fetch_yahoo_comments(ticker, output_file, symbol_index, pool,
+                                  stop_at_id=cursors.get(ticker, 'yahoo'), append=True)
+    if newest:
+        cursors.set(ticker, 'yahoo', newest)
+
+
+def run_watchlist(watchlist_file, output_dir, poll=False):
+    import requests
+    from src.reddit_scraper import fetch_reddit_discussions, create_reddit_client, requests_made
+    from src.alpha_vantage import fetch_news_sentiments, news_cached, since_time_from, count_requests
+    from src.yahoo_scraper import fetch_yahoo_comments, create_connection_pool, close_connection_pool, COUNT_PER_PAGE
+    from src.scheduler import QuotaScheduler
+    from src.cursors import CursorStore
+
+    quotas = create_quotas()
+    # One client per source, shared by every ticker
+    symbol_index = SymbolIndex()
+    session = requests.Session()
+    reddit = create_reddit_client()
+    pool = create_connection_pool()
+    cursors = CursorStore() if poll else None
+
+    tickers = resolve_tickers(load_watchlist(watchlist_file), symbol_index, session, quotas['alpha_vantage'])
+    # Costs below are reserved up front (Yahoo at its worst case, Reddit at its one search) and then settled
+    # against the requests each client really sent for the ticker
+    request_counts = {
+        'reddit': lambda: requests_made(reddit),
+        'alpha_vantage': count_requests(session),
+        'yahoo': lambda: pool.requests_made,
+    }
+    yahoo_pages = math.ceil(YAHOO_MAX_COMMENTS / COUNT_PER_PAGE)
+    try:
+        while True:
+            scheduler = QuotaScheduler(quotas, request_counts)
+            for ticker in tickers:
+                ticker_dir = os.path.join(output_dir, ticker)
+                os.makedirs(ticker_dir, exist_ok=True)
+                reddit_file = os.path.join(ticker_dir, 'reddit_discussions.txt')
+                news_file = os.path.join(ticker_dir, 'marketing_sentiments.txt')
+                yahoo_file = os.path.join(ticker_dir, 'yahoo_comments.txt')
+                if poll:
+                    # After the first poll only new items are fetched and appended
+                    scheduler.submit('reddit', ticker, _poll_reddit, ticker, reddit_file, reddit, cursors)
+                    # Only a cache miss spends quota; the poll asks for the feed since the cursor
+                    news_since = since_time_from(cursors.get(ticker, 'alpha_vantage'))
+                    scheduler.submit('alpha_vantage', ticker, _poll_news, ticker, news_file, session, cursors,
+                                     cost=0 if news_cached(ticker, news_since,
+                                                         ttl_seconds=NEWS_POLL_CACHE_TTL_SECONDS) else 1)
+                    scheduler.submit('yahoo', ticker, _poll_yahoo, ticker, yahoo_file, symbol_index, pool, cursors,
+                                     cost=yahoo_pages)
+                else:
+                    scheduler.submit('reddit', ticker, fetch_reddit_discussions, SUBREDDITS, [ticker], reddit_file,
+                                     reddit)
+                    scheduler.submit('alpha_vantage', ticker, fetch_news_sentiments, ticker, news_file, session,
+                                     cost=0 if news_cached(ticker) else 1)
+                    scheduler.submit('yahoo', ticker, fetch_yahoo_comments, ticker, yahoo_file, symbol_index, pool,
+                                     cost=yahoo_pages)
+            scheduler.run()
+            if not poll:
+                break
+            print(f"Poll finished, next one in {POLL_INTERVAL_SECONDS} seconds")
+            time.sleep(POLL_INTERVAL_SECONDS)
+    except KeyboardInterrupt:
+        print("Polling stopped")
+    finally:
+        close_connection_pool(pool)
+        session.close()
+
+
+def run_backfill(entries, output_dir, start, end):
+    import requests
+    from src.alpha_vantage import backfill_news_sentiments
+    from src.cursors import CursorStore
+
+    quota = create_quotas()['alpha_vantage']
+    symbol_index = SymbolIndex()
+    cursors = CursorStore()
+    with requests.Session() as session:
+        for ticker in resolve_tickers(entries, symbol_index, session, quota):
+            ticker_dir = os.path.join(output_dir, ticker)
+            os.makedirs(ticker_dir, exist_ok=True)
+            # A file of its own: plain runs overwrite marketing_sentiments.*, which would lose the history
+            backfill_news_sentiments(ticker, os.path.join(ticker_dir, 'marketing_sentiments_history.txt'), start, end,
+                                     quota, cursors, session)
+
+
+def run_single(ticker):
+    from src.reddit_scraper import fetch_reddit_discussions
+    from src.alpha_vantage import fetch_news_sentiments
+    from src.yahoo_scraper import fetch_yahoo_comments
+
+    symbol_index = SymbolIndex()
     try:
-        valid_ticker = validate_ticker(ticker)
+        valid_ticker = validate_ticker(ticker, symbol_index)
     except ValueError as e:
         print(e)
         return
 
-    subreddits = ['stocks', 'investing', 'wallstreetbets', 'ValueInvesting']
     search_terms = [valid_ticker]
     reddit_output_file = 'reddit_discussions.txt'
     news_output_file = 'marketing_sentiments.txt'
     yahoo_output_file = 'yahoo_comments.txt'
 
-    fetch_reddit_discussions(subreddits, search_terms, reddit_output_file)
+    fetch_reddit_discussions(SUBREDDITS, search_terms, reddit_output_file)
     fetch_news_sentiments(valid_ticker, news_output_file)
-    fetch_yahoo_comments(valid_ticker, yahoo_output_file)
+    fetch_yahoo_comments(valid_ticker, yahoo_output_file, symbol_index)
+
+
+def _parse_day(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape discussions and news sentiment for stock tickers")
+    parser.add_argument('--watchlist', help="File with one ticker or company name per line (non-interactive)")
+    parser.add_argument('--output-dir', default='output', help="Where watchlist results are written, one folder per ticker")
+    parser.add_argument('--poll', action='store_true',
+                        help="Keep running, appending only items newer than the last poll (requires --watchlist)")
+    parser.add_argument('--backfill-from', type=_parse_day, metavar='YYYY-MM-DD',
+                        help="Backfill news sentiment history from this day instead of scraping (resumable)")
+    parser.add_argument('--backfill-to', type=_parse_day, metavar='YYYY-MM-DD', help="End of the backfill (default: now)")
+    parser.add_argument('ticker', nargs='?', help="Ticker or company name (prompted for when omitted)")
+    args = parser.parse_args(argv)
+
+    if args.poll and not args.watchlist:
+        parser.error("--poll requires --watchlist")
+    if args.backfill_from:
+        entries = load_watchlist(args.watchlist) if args.watchlist else [args.ticker or input("Enter the stock ticker: ")]
+        run_backfill(entries, args.output_dir, args.backfill_from, args.backfill_to or datetime.now())
+        return
+    if args.watchlist:
+        run_watchlist(args.watchlist, args.output_dir, poll=args.poll)
+        return
+
+    run_single(args.ticker or input("Enter the stock ticker: "))
 
 
 if __name__ == "__main__":
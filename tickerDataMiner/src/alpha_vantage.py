@@ -1,36 +1,194 @@
 import requests
-from config import ALPHA_VANTAGE_API_KEY
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from config import ALPHA_VANTAGE_API_KEY, ALPHA_VANTAGE_API_URL, NEWS_CACHE_TTL_SECONDS, \
+    NEWS_BACKFILL_WINDOW_DAYS, NEWS_BACKFILL_LIMIT, NEWS_BACKFILL_WORKERS
+from src.cache import load_cached, save_cached
+from src.records import NewsArticle, parse_time_published, stable_id
+from src.writers import open_writer, output_path
 
 
-def fetch_news_sentiments(ticker, output_file):
-    url = f'https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers={ticker}&apikey={ALPHA_VANTAGE_API_KEY}'
-    r = requests.get(url)
+API_TIME_FORMAT = '%Y%m%dT%H%M'
+
+
+def _cache_key(ticker, time_from=None, time_to=None, limit=None):
+    key = f"{ticker}|{time_from}|{time_to}"
+    return f"{key}|{limit}" if limit else key
+
+
+def since_time_from(since):
+    # The API takes YYYYMMDDTHHMM; since is a full time_published (YYYYMMDDTHHMMSS)
+    return since[:13] if since else None
+
+
+def news_cached(ticker, time_from=None, time_to=None, limit=None, ttl_seconds=NEWS_CACHE_TTL_SECONDS):
+    return load_cached('news', _cache_key(ticker, time_from, time_to, limit), ttl_seconds) is not None
+
+
+def count_requests(session):
+    # Counts the responses the session receives; returns a function giving the running total
+    made = [0]
+    lock = threading.Lock()
+
+    def on_response(response, *args, **kwargs):
+        with lock:
+            made[0] += 1
+
+    session.hooks['response'].append(on_response)
+    return lambda: made[0]
+
+
+def _request_news(ticker, time_from=None, time_to=None, session=None, limit=None,
+                  ttl_seconds=NEWS_CACHE_TTL_SECONDS):
+    # Cached per ticker and time window so repeated runs inside the TTL cost no quota
+    cache_key = _cache_key(ticker, time_from, time_to, limit)
+    data = load_cached('news', cache_key, ttl_seconds)
+    if data is not None:
+        return data
+
+    params = {'function': 'NEWS_SENTIMENT', 'tickers': ticker, 'apikey': ALPHA_VANTAGE_API_KEY}
+    if time_from:
+        params['time_from'] = time_from
+    if time_to:
+        params['time_to'] = time_to
+    if limit:
+        params['limit'] = limit
+    r = (session or requests).get(ALPHA_VANTAGE_API_URL, params=params)
     data = r.json()
+    # Rate limit notices come back without a feed and must not be cached
+    if 'feed' in data:
+        save_cached('news', cache_key, data)
+    return data
+
 
-    formatted_data = []
-    for item in data['feed']:
+def _articles_for(data, ticker):
+    # An article lists every ticker it mentions; keep it only if it is relevant enough to this one
+    articles = []
+    for item in data.get('feed', []):
         for ticker_data in item['ticker_sentiment']:
             if ticker_data['ticker'] == ticker and float(ticker_data['relevance_score']) > 0.2:
-                formatted_data.append({
-                    'title': item['title'],
-                    'url': item['url'],
-                    'time_published': item['time_published'],
-                    'source': item['source'],
-                    'summary': item['summary'],
-                    'relevance_score': ticker_data['relevance_score'],
-                    'ticker_sentiment_score': ticker_data['ticker_sentiment_score'],
-                    'ticker_sentiment_label': ticker_data['ticker_sentiment_label']
-                })
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for entry in formatted_data:
-            f.write(f"Title: {entry['title']}\n")
-            f.write(f"URL: {entry['url']}\n")
-            f.write(f"Time Published: {entry['time_published']}\n")
-            f.write(f"Source: {entry['source']}\n")
-            f.write(f"Summary: {entry['summary']}\n")
-            f.write(f"Relevance Score: {entry['relevance_score']}\n")
-            f.write(f"Sentiment Score: {entry['ticker_sentiment_score']}\n")
-            f.write(f"Sentiment Label: {entry['ticker_sentiment_label']}\n")
-            f.write("-" * 30 + "\n")
-    print(f"News sentiments saved to {output_file}")
+                articles.append(NewsArticle(
+                    id=stable_id(item['url']),
+                    ticker=ticker,
+                    created_utc=parse_time_published(item['time_published']),
+                    title=item['title'],
+                    url=item['url'],
+                    publisher=item['source'],
+                    text=item['summary'],
+                    relevance_score=float(ticker_data['relevance_score']),
+                    sentiment_score=float(ticker_data['ticker_sentiment_score']),
+                    sentiment_label=ticker_data['ticker_sentiment_label'],
+                    time_published=item['time_published']
+                ))
+    return articles
+
+
+def _write_sentiments(articles, output_file, append=False):
+    with open_writer(output_file, NewsArticle, append=append) as writer:
+        for article in articles:
+            writer.write(article)
+    print(f"News sentiments saved to {output_path(output_file)}")
+
+
+def fetch_news_sentiments(ticker, output_file, session=None, since=None, append=False,
+                          ttl_seconds=NEWS_CACHE_TTL_SECONDS):
+    # since is the newest time_published already collected; returns the newest one written this time
+    data = _request_news(ticker, time_from=since_time_from(since), session=session, ttl_seconds=ttl_seconds)
+    if 'feed' not in data:
+        print(f"Error: no news feed returned for {ticker}: {data}")
+        return since
+    articles = [article for article in _articles_for(data, ticker)
+                if not since or article.time_published > since]
+    _write_sentiments(articles, output_file, append)
+    return max((article.time_published for article in articles), default=since)
+
+
+def _backfill_windows(start, end, window_days):
+    windows = []
+    while start < end:
+        stop = min(start + timedelta(days=window_days), end)
+        windows.append((start, stop))
+        start = stop
+    return windows
+
+
+def _covered_ranges(cursors, ticker):
+    # Backfilled (from, to) datetime ranges of a ticker, kept sorted and merged in the 'alpha_vantage_backfill' cursor
+    return [(datetime.strptime(start, API_TIME_FORMAT), datetime.strptime(end, API_TIME_FORMAT))
+            for start, end in cursors.get(ticker, 'alpha_vantage_backfill') or []]
+
+
+def _add_range(ranges, new_range):
+    merged = []
+    for start, end in sorted(ranges + [new_range]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_ranges(start, end, covered):
+    # Parts of start..end outside the sorted, merged covered ranges
+    missing = []
+    for covered_start, covered_end in covered:
+        if start >= end:
+            break
+        if covered_start > start:
+            missing.append((start, min(covered_start, end)))
+        start = max(start, covered_end)
+    if start < end:
+        missing.append((start, end))
+    return missing
+
+
+def backfill_news_sentiments(ticker, output_file, start, end, quota, cursors, session=None,
+                             window_days=NEWS_BACKFILL_WINDOW_DAYS, max_workers=NEWS_BACKFILL_WORKERS):
+    # Fetches the history from start to end (datetimes) in time windows, several at once under the quota.
+    # The ranges already backfilled are kept in the 'alpha_vantage_backfill' cursor; only the parts of start..end
+    # outside them are fetched, and each window is added to them once written, so a rerun (or a backfill of an
+    # earlier or overlapping range) fetches nothing twice. Returns the number of articles written.
+    covered = _covered_ranges(cursors, ticker)
+    windows = [window for gap in _missing_ranges(start, end, covered)
+               for window in _backfill_windows(gap[0], gap[1], window_days)]
+    if not windows:
+        print(f"{ticker}: news backfill already covers {start:%Y-%m-%d} to {end:%Y-%m-%d}")
+        return 0
+
+    def fetch(window):
+        # Windows are disjoint to the minute, since the API treats time_to as inclusive
+        time_from = window[0].strftime(API_TIME_FORMAT)
+        time_to = (window[1] - timedelta(minutes=1)).strftime(API_TIME_FORMAT)
+        if not news_cached(ticker, time_from, time_to, NEWS_BACKFILL_LIMIT) and not quota.acquire():
+            return None
+        return _request_news(ticker, time_from, time_to, session, limit=NEWS_BACKFILL_LIMIT)
+
+    seen_urls = set()
+    written = 0
+    with open_writer(output_file, NewsArticle, append=True) as writer, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch, window) for window in windows]
+        for window, future in zip(windows, futures):
+            data = future.result()
+            if data is None or 'feed' not in data:
+                reason = "daily quota exhausted" if data is None else data
+                print(f"{ticker}: news backfill stopped at {window[0]:%Y-%m-%d}: {reason}")
+                for pending in futures:
+                    pending.cancel()
+                break
+            if len(data['feed']) >= NEWS_BACKFILL_LIMIT:
+                print(f"{ticker}: {window[0]:%Y-%m-%d} to {window[1]:%Y-%m-%d} hit the {NEWS_BACKFILL_LIMIT} article "
+                      f"limit, older articles in it are missing; use a shorter window")
+            for article in _articles_for(data, ticker):
+                # An article can come back in two windows when it sits right on the boundary
+                if article.url not in seen_urls:
+                    seen_urls.add(article.url)
+                    writer.write(article)
+                    written += 1
+            covered = _add_range(covered, window)
+            cursors.set(ticker, 'alpha_vantage_backfill',
+                        [[a.strftime(API_TIME_FORMAT), b.strftime(API_TIME_FORMAT)] for a, b in covered])
+
+    print(f"{ticker}: backfilled {written} news sentiments into {output_path(output_file)}")
+    return written
@@ -0,0 +1,32 @@
+# cache.py
+import hashlib
+import json
+import os
+import time
+from config import CACHE_DIR
+
+
+def _cache_path(namespace, key):
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, namespace, f"{digest}.json")
+
+
+def load_cached(namespace, key, ttl_seconds):
+    # Entries older than ttl_seconds count as misses; the file mtime is the write time
+    path = _cache_path(namespace, key)
+    try:
+        if time.time() - os.path.getmtime(path) > ttl_seconds:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_cached(namespace, key, data):
+    path = _cache_path(namespace, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
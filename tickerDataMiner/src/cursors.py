@@ -0,0 +1,68 @@
+# cursors.py
+import json
+import os
+import threading
+from contextlib import contextmanager
+from config import CURSOR_FILE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(path):
+    # Exclusive lock between processes (a --poll daemon and a backfill share the cursor file)
+    with open(f"{path}.lock", 'a+') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CursorStore:
+    # High-water marks per ticker and source, e.g. {"AMZN": {"reddit": 1736590000.0, "yahoo": "...", ...}}
+
+    def __init__(self, path=CURSOR_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.cursors = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def get(self, ticker, source):
+        with self._lock:
+            return self.cursors.get(ticker, {}).get(source)
+
+    def set(self, ticker, source, value):
+        # Saved immediately so a crash never replays items that were already appended. Other processes may have
+        # saved their own cursors since this one loaded, so the file is reread and only this cursor changed.
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with _file_lock(self.path):
+                self.cursors = self._load()
+                self.cursors.setdefault(ticker, {})[source] = value
+                self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cursors, f)
+        os.replace(tmp_path, self.path)
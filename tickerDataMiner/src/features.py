@@ -0,0 +1,94 @@
+# features.py
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from config import FEATURE_BATCH_SIZE, FEATURE_HASH_SIZE
+
+# Any run of URLs, punctuation or whitespace collapses to one space; $TICKER cashtags are kept
+SEPARATOR_PATTERN = r'(?:https?://\S+|www\.\S+|[^\w$]|\$(?!\w))+'
+TOKEN_PATTERN = r'(?u)\$?\b\w\w+\b'
+META_COLUMNS = ['id', 'ticker', 'source', 'created_utc']
+
+
+def iter_record_frames(paths, batch_size=FEATURE_BATCH_SIZE):
+    # Collected JSONL files or Parquet directories, read in DataFrame chunks without parsing text formats
+    for path in paths:
+        if os.path.isdir(path) or path.endswith('.parquet'):
+            import pyarrow.dataset as ds
+            for batch in ds.dataset(path, format='parquet').to_batches(batch_size=batch_size):
+                yield batch.to_pandas()
+        else:
+            with pd.read_json(path, lines=True, chunksize=batch_size, dtype=False) as reader:
+                for frame in reader:
+                    yield frame
+
+
+def record_text(frame):
+    text = frame['text'].fillna('').astype(str)
+    if 'title' in frame.columns:
+        text = frame['title'].fillna('').astype(str).str.cat(text, sep=' ')
+    return text
+
+
+def normalize_text(text):
+    return text.str.lower().str.replace(SEPARATOR_PATTERN, ' ', regex=True).str.strip()
+
+
+def make_vectorizer(n_features=FEATURE_HASH_SIZE):
+    # Raw counts (no sign flipping, no normalisation) so row sums are token counts
+    return HashingVectorizer(n_features=n_features, token_pattern=TOKEN_PATTERN, lowercase=False,
+                             alternate_sign=False, norm=None, dtype=np.float32)
+
+
+def extract_features(paths, batch_size=FEATURE_BATCH_SIZE, n_features=FEATURE_HASH_SIZE):
+    # Returns (CSR matrix, metadata DataFrame with token_count), one row per unique normalised text
+    vectorizer = make_vectorizer(n_features)
+    seen = np.empty(0, dtype=np.uint64)
+    matrices = []
+    metadata = []
+    for frame in iter_record_frames(paths, batch_size):
+        normalized = normalize_text(record_text(frame))
+        hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+        keep = ((normalized.str.len() > 0).to_numpy()
+                & ~pd.Series(hashes).duplicated().to_numpy()
+                & ~np.isin(hashes, seen))
+        if not keep.any():
+            continue
+        seen = np.union1d(seen, hashes[keep])
+
+        matrix = vectorizer.transform(normalized[keep])
+        meta = frame.loc[keep, [column for column in META_COLUMNS if column in frame.columns]].reset_index(drop=True)
+        meta['token_count'] = np.asarray(matrix.sum(axis=1)).ravel().astype(np.int32)
+        matrices.append(matrix)
+        metadata.append(meta)
+
+    if not matrices:
+        return sparse.csr_matrix((0, n_features), dtype=np.float32), pd.DataFrame(columns=META_COLUMNS + ['token_count'])
+    return sparse.vstack(matrices, format='csr'), pd.concat(metadata, ignore_index=True)
+
+
+def save_features(matrix, metadata, output_prefix):
+    directory = os.path.dirname(output_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    sparse.save_npz(f"{output_prefix}.npz", matrix)
+    metadata.to_json(f"{output_prefix}.meta.jsonl", orient='records', lines=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hash collected items into sparse text features")
+    parser.add_argument('inputs', nargs='+', help="JSONL files or Parquet directories written by the scrapers")
+    parser.add_argument('--output-prefix', default='features/items',
+                        help="Writes <prefix>.npz (sparse counts) and <prefix>.meta.jsonl (ids and token counts)")
+    args = parser.parse_args(argv)
+
+    matrix, metadata = extract_features(args.inputs)
+    save_features(matrix, metadata, args.output_prefix)
+    print(f"Saved {matrix.shape[0]} unique items x {matrix.shape[1]} hashed features to {args.output_prefix}.npz")
+
+
+if __name__ == "__main__":
+    main()
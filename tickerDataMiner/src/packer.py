@@ -0,0 +1,164 @@
+# packer.py
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from config import FEATURE_BATCH_SIZE, PACK_TOKEN_BUDGET, PACK_ENCODING
+from src.features import iter_record_frames, record_text, normalize_text
+
+
+class TokenCounter:
+    # Exact counts with tiktoken when it is installed, otherwise about four characters per token
+
+    def __init__(self, encoding=PACK_ENCODING):
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding)
+        except ImportError:
+            self._encoding = None
+
+    def count(self, texts):
+        if self._encoding is None:
+            return np.ceil(texts.str.len().to_numpy() / 4).astype(np.int64)
+        return np.array([len(tokens) for tokens in self._encoding.encode_batch(texts.tolist())], dtype=np.int64)
+
+    def truncate(self, text, max_tokens):
+        # Returns the cut text and its token count, which is at most max_tokens
+        if self._encoding is None:
+            text = text[:max_tokens * 4]
+            return text, -(-len(text) // 4)
+        # Decoding a cut token list can produce text that encodes to more tokens (merges across the cut, a
+        # split multi-byte character), so cut again by the overshoot until the re-encoded text fits
+        keep = max_tokens
+        while True:
+            text = self._encoding.decode(self._encoding.encode(text)[:keep])
+            tokens = len(self._encoding.encode(text))
+            if tokens <= max_tokens:
+                return text, tokens
+            keep -= tokens - max_tokens
+
+
+def load_items(paths, batch_size=FEATURE_BATCH_SIZE):
+    # One row per unique item (by normalised text) with its rendered text and a rank, best first
+    frames = []
+    for frame in iter_record_frames(paths, batch_size):
+        text = record_text(frame)
+        times = pd.to_datetime(frame['created_utc'], unit='s', utc=True).dt.strftime('%Y-%m-%d %H:%M')
+        items = pd.DataFrame({
+            'id': frame['id'].astype(str),
+            'ticker': frame['ticker'].astype(str),
+            'source': frame['source'].astype(str),
+            'created_utc': frame['created_utc'].astype(float),
+            # Source and time travel with every item so the model can weigh and date it
+            'text': '[' + frame['source'].astype(str) + ' ' + times + '] ' + text.str.strip(),
+            'relevance': (pd.to_numeric(frame['relevance_score'], errors='coerce').fillna(1.0)
+                          if 'relevance_score' in frame.columns else 1.0),
+            'key': pd.util.hash_pandas_object(normalize_text(text), index=False).to_numpy(),
+            'empty': (text.str.strip().str.len() == 0).to_numpy(),
+        })
+        frames.append(items[~items['empty']].drop(columns='empty'))
+    if not frames:
+        return pd.DataFrame(columns=['id', 'ticker', 'source', 'created_utc', 'text', 'relevance'])
+
+    items = pd.concat(frames, ignore_index=True)
+    # Only Alpha Vantage news has a relevance score (at most 1.0, the default given to everything else), so
+    # scores are compared within a source: items are ranked by relevance, then recency, inside their ticker and
+    # source, and the sources interleave by the fraction of that ranking each item sits at
+    items = items.sort_values(['relevance', 'created_utc'], ascending=False, kind='stable')
+    groups = items.groupby(['ticker', 'source'], sort=False)
+    items['rank'] = groups.cumcount() / groups['source'].transform('size')
+    items = items.sort_values(['rank', 'created_utc'], ascending=[True, False], kind='stable')
+    # A repost keeps only its best-ranked copy
+    items = items.drop_duplicates(subset=['ticker', 'key']).drop(columns=['key', 'rank'])
+    return items.reset_index(drop=True)
+
+
+def first_fit(sizes, order, budget, max_batches=None):
+    # Places items (in the given order) into the first batch with room; returns each item's batch or -1
+    remaining = []
+    assignment = np.full(len(sizes), -1, dtype=np.int64)
+    for i in order:
+        size = sizes[i]
+        for batch, room in enumerate(remaining):
+            if size <= room:
+                remaining[batch] -= size
+                assignment[i] = batch
+                break
+        else:
+            if max_batches is None or len(remaining) < max_batches:
+                assignment[i] = len(remaining)
+                remaining.append(budget - size)
+    return assignment
+
+
+def pack(items, counter, budget=PACK_TOKEN_BUDGET, max_batches=None):
+    """
+    Pack one ticker's ranked items into as few batches of at most budget tokens as possible
+
+    Without max_batches this is first-fit decreasing (largest items first), which uses close to the minimum
+    number of batches. With max_batches, items are placed in rank order and those that no longer fit are left
+    out, so a capped number of calls carries the best-ranked items. Items longer than the budget are truncated.
+    """
+    if items.empty:
+        return []
+    items = items.copy()
+    items['tokens'] = counter.count(items['text'])
+    too_long = items['tokens'] > budget
+    if too_long.any():
+        truncated = [counter.truncate(text, budget) for text in items.loc[too_long, 'text']]
+        items.loc[too_long, 'text'] = [text for text, _ in truncated]
+        items.loc[too_long, 'tokens'] = [tokens for _, tokens in truncated]
+
+    sizes = items['tokens'].to_numpy()
+    order = np.arange(len(items)) if max_batches else np.argsort(-sizes, kind='stable')
+    items['batch'] = first_fit(sizes, order, budget, max_batches)
+    dropped = int((items['batch'] < 0).sum())
+    if dropped:
+        print(f"{items['ticker'].iloc[0]}: {dropped} lower-ranked items did not fit in {max_batches} batches")
+
+    batches = []
+    for number, batch in items[items['batch'] >= 0].groupby('batch', sort=True):
+        # Chronological inside a batch reads naturally; ranking only decided what got in
+        batch = batch.sort_values('created_utc', kind='stable')
+        batches.append({
+            'ticker': batch['ticker'].iloc[0],
+            'batch': int(number),
+            'token_count': int(batch['tokens'].sum()),
+            'token_budget': budget,
+            'sources': batch['source'].value_counts().to_dict(),
+            'start_utc': float(batch['created_utc'].min()),
+            'end_utc': float(batch['created_utc'].max()),
+            'items': batch[['id', 'source', 'created_utc', 'tokens', 'text']].to_dict(orient='records'),
+        })
+    return batches
+
+
+def pack_files(paths, output_file, budget=PACK_TOKEN_BUDGET, max_batches=None, counter=None):
+    counter = counter or TokenCounter()
+    items = load_items(paths)
+    written = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for _, ticker_items in items.groupby('ticker', sort=True):
+            for batch in pack(ticker_items, counter, budget, max_batches):
+                f.write(json.dumps(batch, ensure_ascii=False, default=int) + '\n')
+                written += 1
+    return len(items), written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack collected items into token-budgeted batches for a model")
+    parser.add_argument('inputs', nargs='+', help="JSONL files or Parquet directories written by the scrapers")
+    parser.add_argument('--budget', type=int, default=PACK_TOKEN_BUDGET, help="Tokens per batch")
+    parser.add_argument('--max-batches', type=int, help="Keep only the best-ranked items that fit in this many batches")
+    parser.add_argument('--output', default='batches.jsonl', help="One batch per line")
+    args = parser.parse_args(argv)
+
+    counter = TokenCounter()
+    items, batches = pack_files(args.inputs, args.output, args.budget, args.max_batches, counter)
+    method = "tiktoken" if counter._encoding is not None else "a 4 characters per token estimate"
+    print(f"Packed {items} unique items into {batches} batches of at most {args.budget} tokens "
+          f"(counted with {method}), saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
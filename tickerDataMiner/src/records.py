@@ -0,0 +1,62 @@
+# records.py
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+# Every record carries the same leading fields so sources can be loaded side by side:
+# a stable id, the ticker it was collected for, and a UTC epoch timestamp.
+
+
+@dataclass
+class RedditItem:
+    id: str  # Reddit fullname, t3_ for posts and t1_ for comments
+    ticker: str
+    created_utc: float
+    kind: str  # 'post' or 'comment'
+    submission_id: str
+    parent_id: Optional[str]
+    subreddit: str
+    author: Optional[str]
+    title: Optional[str]
+    url: Optional[str]
+    text: str
+    source: str = 'reddit'
+
+
+@dataclass
+class YahooComment:
+    id: str
+    ticker: str
+    created_utc: float
+    parent_id: Optional[str]
+    author: str
+    text: str
+    source: str = 'yahoo'
+
+
+@dataclass
+class NewsArticle:
+    id: str  # Hash of the article URL
+    ticker: str
+    created_utc: float
+    title: str
+    url: str
+    publisher: str
+    text: str  # Article summary
+    relevance_score: float
+    sentiment_score: float
+    sentiment_label: str
+    time_published: str  # Alpha Vantage's original YYYYMMDDTHHMMSS value
+    source: str = 'alpha_vantage'
+
+
+RECORD_TYPES = {'reddit': RedditItem, 'yahoo': YahooComment, 'alpha_vantage': NewsArticle}
+
+
+def stable_id(*parts):
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:16]
+
+
+def parse_time_published(time_published):
+    return datetime.strptime(time_published, '%Y%m%dT%H%M%S').replace(tzinfo=timezone.utc).timestamp()
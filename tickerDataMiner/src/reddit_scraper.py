@@ -1,35 +1,189 @@
 import praw
-import requests
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from praw.const import API_PATH
+from praw.models import MoreComments
+from prawcore.exceptions import PrawcoreException
 from datetime import datetime, timedelta, timezone
-from bs4 import BeautifulSoup
-from config import REDDIT_LIMIT, TIME_RANGE_DAYS, REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT
+from src.records import RedditItem
+from src.writers import open_writer, output_path
+from config import REDDIT_LIMIT, TIME_RANGE_DAYS, REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT, \
+    REDDIT_INFO_BATCH_SIZE, REDDIT_MAX_WORKERS, REDDIT_MORE_REQUESTS_PER_THREAD, REDDIT_API_URL, REDDIT_AUTH_URL
 
 
-def fetch_reddit_discussions(subreddits, search_terms, output_file):
-    reddit = praw.Reddit(client_id=REDDIT_CLIENT_ID, client_secret=REDDIT_CLIENT_SECRET, user_agent=REDDIT_USER_AGENT)
+def _load_comments(submission):
+    # Runs in a worker thread so several comment trees are parsed at once. The fetch itself goes through the
+    # client's request lock (see serialise_requests), so the workers never race prawcore's rate limiter.
+    return submission.comments
+
+
+def _expand_more(reddit, submission, more):
+    # Calls the API directly: more.comments() would cache every expansion on the tree and keep it all in memory
+    if more.count == 0:
+        # "Continue this thread": the branch is the parent comment's replies on its own permalink page
+        path = f"{API_PATH['submission'].format(id=submission.id)}_/{more.parent_id.split('_', 1)[1]}"
+        _, comments = reddit.get(path, params={'limit': submission.comment_limit, 'sort': submission.comment_sort})
+        return comments.children[0].replies
+    # A flat list in tree order; children come right after their parent
+    return reddit.post(API_PATH['morechildren'], data={
+        'children': ','.join(more.children), 'link_id': submission.fullname, 'sort': submission.comment_sort})
+
+
+def iter_comments(reddit, submission, forest, executor, cutoff_utc, budget=REDDIT_MORE_REQUESTS_PER_THREAD):
+    """
+    Yield the comments of a submission created after cutoff_utc, expanding collapsed branches as it goes
+
+    The loaded tree is walked depth first. Each "load more comments" link is queued as it is found and expanded
+    on the executor, at most REDDIT_MAX_WORKERS at a time and at most budget requests per submission; the
+    expanded branches are walked in the order their links were found. Only the current branch and the
+    expansions in flight are held, so memory stays flat however large the thread is. The expansions share
+    reddit across threads, so its requests are serialised first (see serialise_requests).
+    """
+    serialise_requests(reddit)
+    waiting = deque()
+    pending = deque()
+
+    def fill():
+        nonlocal budget
+        while waiting and budget > 0 and len(pending) < REDDIT_MAX_WORKERS:
+            budget -= 1
+            pending.append(executor.submit(_expand_more, reddit, submission, waiting.popleft()))
+
+    def walk(nodes):
+        stack = [iter(nodes)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+            elif isinstance(node, MoreComments):
+                waiting.append(node)
+                fill()
+            else:
+                # Replies can be newer than their parent, so an old comment's branch is still walked
+                if node.created_utc > cutoff_utc:
+                    yield node
+                stack.append(iter(node.replies))
+
+    yield from walk(forest)
+    while pending:
+        future = pending.popleft()
+        fill()
+        try:
+            nodes = future.result()
+        except PrawcoreException as e:
+            print(f"Error: could not expand comments of {submission.fullname}: {e}")
+            continue
+        yield from walk(nodes)
+
+    skipped = sum(more.count for more in waiting)
+    if skipped:
+        print(f"{submission.fullname}: request budget used up, {skipped} collapsed comments not fetched")
+
+
+def _resolve_submissions(reddit, fullnames):
+    # One /api/info round trip per batch instead of one page scrape per submission
+    for i in range(0, len(fullnames), REDDIT_INFO_BATCH_SIZE):
+        yield list(reddit.info(fullnames=fullnames[i:i + REDDIT_INFO_BATCH_SIZE]))
+
+
+def _time_filter(days):
+    # Smallest Reddit time_filter window that still covers the requested range
+    for name, span in (('day', 1), ('week', 7), ('month', 31), ('year', 366)):
+        if days <= span:
+            return name
+    return 'all'
+
+
+def _search_new(subreddit, search_term, cutoff_utc):
+    # Results arrive newest first, so the first one at or before the cutoff ends the listing
+    matches = []
+    for submission in subreddit.search(search_term, sort='new', time_filter=_time_filter(TIME_RANGE_DAYS),
+                                       limit=REDDIT_LIMIT):
+        if submission.created_utc <= cutoff_utc:
+            break
+        matches.append((submission.fullname, search_term))
+    return matches
+
+
+def serialise_requests(reddit):
+    """
+    Make a praw client safe to share between worker threads
+
+    praw is not thread safe: prawcore's rate limiter reads and updates its state without a lock, so concurrent
+    calls can all pass the same delay check and go over Reddit's limit, and token refreshes can race as well.
+    Every request on the client's prawcore sessions goes through one lock (rate limit wait included), so the
+    limiter sees them one at a time; turning the responses into praw objects still runs in the workers.
+    """
+    lock = getattr(reddit, '_request_lock', None)
+    if lock is not None:
+        return reddit
+    reddit._request_lock = lock = threading.Lock()
+    reddit._requests_made = 0
+    for core in {id(core): core for core in (reddit._core, getattr(reddit, '_read_only_core', None),
+                                             getattr(reddit, '_authorized_core', None)) if core}.values():
+        request = core.request
+
+        def locked_request(*args, request=request, **kwargs):
+            with lock:
+                reddit._requests_made += 1
+                return request(*args, **kwargs)
+
+        core.request = locked_request
+    return reddit
+
+
+def requests_made(reddit):
+    # API calls sent through a client prepared by serialise_requests (searches, comment trees, "load more")
+    return reddit._requests_made
+
+
+def create_reddit_client():
+    return serialise_requests(praw.Reddit(client_id=REDDIT_CLIENT_ID, client_secret=REDDIT_CLIENT_SECRET,
+                                          user_agent=REDDIT_USER_AGENT, oauth_url=REDDIT_API_URL,
+                                          reddit_url=REDDIT_AUTH_URL))
+
+
+def fetch_reddit_discussions(subreddits, search_terms, output_file, reddit=None, since_utc=None, append=False):
+    # since_utc is the newest post time already collected; returns the newest post time written this time
+    # The search, comment tree and "load more" pools below all share this one client
+    reddit = serialise_requests(reddit or create_reddit_client())
     current_time = datetime.now(timezone.utc)
     time_range = current_time - timedelta(days=TIME_RANGE_DAYS)
+    cutoff_utc = max(time_range.timestamp(), since_utc or 0)
+
+    # One multi-subreddit query per search term, searched from worker threads
+    subreddit = reddit.subreddit('+'.join(subreddits))
+    fullnames = []
+    matched_terms = {}
+    with ThreadPoolExecutor(max_workers=REDDIT_MAX_WORKERS) as executor:
+        results = executor.map(lambda term: _search_new(subreddit, term, cutoff_utc), search_terms)
+        for matches in results:
+            for fullname, search_term in matches:
+                if fullname not in matched_terms:
+                    matched_terms[fullname] = search_term
+                    fullnames.append(fullname)
 
-    with open(output_file, 'w', encoding='utf-8') as file:
-        for subreddit_name in subreddits:
-            subreddit = reddit.subreddit(subreddit_name)
-            for search_term in search_terms:
-                for submission in subreddit.search(search_term, limit=REDDIT_LIMIT):
-                    submission_time = datetime.fromtimestamp(submission.created_utc, timezone.utc)
-                    if submission_time >= time_range:
-                        file.write(f"Title: {submission.title}\n")
-                        file.write(f"URL: {submission.url}\n")
-                        response = requests.get(submission.url, headers={'User-Agent': REDDIT_USER_AGENT})
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        post_content = soup.find('div', class_='_1qeIAgB0cPwnLhDF9XSiJM')
-                        if post_content:
-                            file.write(f"Content: {post_content.get_text()}\n")
-                        submission.comments.replace_more(limit=0)
-                        for comment in submission.comments.list():
-                            comment_time = datetime.fromtimestamp(comment.created_utc, timezone.utc)
-                            if comment_time >= time_range:
-                                file.write(f"Comment by {comment.author} at {comment_time}:\n")
-                                file.write(f"{comment.body}\n")
-                                file.write("-" * 40 + "\n")
-                        file.write("\n" + "-" * 80 + "\n\n")
-    print(f"Discussions saved to {output_file}")
+    newest_utc = since_utc
+    with open_writer(output_file, RedditItem, append=append) as writer, \
+            ThreadPoolExecutor(max_workers=REDDIT_MAX_WORKERS) as executor, \
+            ThreadPoolExecutor(max_workers=REDDIT_MAX_WORKERS) as more_executor:
+        for batch in _resolve_submissions(reddit, fullnames):
+            forests = executor.map(_load_comments, batch)
+            for submission, forest in zip(batch, forests):
+                ticker = matched_terms[submission.fullname]
+                subreddit_name = str(submission.subreddit)
+                newest_utc = max(newest_utc or 0, submission.created_utc)
+                writer.write(RedditItem(
+                    id=submission.fullname, ticker=ticker, created_utc=submission.created_utc, kind='post',
+                    submission_id=submission.fullname, parent_id=None, subreddit=subreddit_name,
+                    author=str(submission.author) if submission.author else None,
+                    title=submission.title, url=submission.url, text=submission.selftext))
+                for comment in iter_comments(reddit, submission, forest, more_executor, cutoff_utc):
+                    writer.write(RedditItem(
+                        id=comment.fullname, ticker=ticker, created_utc=comment.created_utc, kind='comment',
+                        submission_id=submission.fullname, parent_id=comment.parent_id, subreddit=subreddit_name,
+                        author=str(comment.author) if comment.author else None,
+                        title=None, url=None, text=comment.body))
+    print(f"Discussions saved to {output_path(output_file)}")
+    return newest_utc
@@ -0,0 +1,81 @@
+# scheduler.py
+import threading
+import time
+from collections import deque
+from datetime import date
+
+
+class SourceQuota:
+    # Spaces calls evenly to stay under a per-minute rate and stops handing out calls once the daily quota is spent
+
+    def __init__(self, calls_per_minute, calls_per_day=None):
+        self.interval = 60.0 / calls_per_minute
+        self.calls_per_day = calls_per_day
+        self.used = 0
+        self._day = date.today()
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1):
+        with self._lock:
+            if date.today() != self._day:
+                # Long-running polls get a fresh daily quota each day
+                self._day = date.today()
+                self.used = 0
+            if self.calls_per_day is not None and self.used + cost > self.calls_per_day:
+                return False
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval * cost
+            self.used += cost
+        if start > now:
+            time.sleep(start - now)
+        return True
+
+    def settle(self, reserved, made):
+        # Replaces a reservation taken with acquire by the calls the task really made: extra calls push the next
+        # one back and count against the day, unused ones are handed back
+        with self._lock:
+            self.used = max(0, self.used + made - reserved)
+            self._next_time += self.interval * (made - reserved)
+
+
+class QuotaScheduler:
+    # One worker per source, each draining its own queue of per-ticker tasks.
+    # Sources run side by side, so total wall time is bounded by the slowest quota rather than tickers x sources.
+    # A task's cost is reserved before it runs; when request_counts gives a source's running total of requests
+    # sent, the reservation is settled against what the task really sent (each source runs one task at a time).
+
+    def __init__(self, quotas, request_counts=None):
+        self.quotas = quotas
+        self.request_counts = request_counts or {}
+        self.queues = {source: deque() for source in quotas}
+
+    def submit(self, source, ticker, fn, *args, cost=1):
+        self.queues[source].append((ticker, fn, args, cost))
+
+    def _drain(self, source):
+        tasks, quota = self.queues[source], self.quotas[source]
+        while tasks:
+            ticker, fn, args, cost = tasks.popleft()
+            if not quota.acquire(cost):
+                print(f"{source}: daily quota exhausted, skipping {len(tasks) + 1} remaining tickers")
+                tasks.clear()
+                return
+            count = self.request_counts.get(source)
+            before = count() if count else None
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"{source}: failed for {ticker}: {e}")
+            finally:
+                if count:
+                    quota.settle(cost, count() - before)
+
+    def run(self):
+        workers = [threading.Thread(target=self._drain, args=(source,), name=f"{source}-worker")
+                   for source in self.queues]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,146 @@
+# sentiment.py
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from config import FEATURE_BATCH_SIZE, SENTIMENT_BUCKET_SECONDS, SENTIMENT_WINDOW_BUCKETS
+from src.features import iter_record_frames
+
+
+def load_arrays(paths, batch_size=FEATURE_BATCH_SIZE):
+    # Per-item ticker, source, timestamp, sentiment score and relevance weight from collected records.
+    # Reddit and Yahoo items have no score (NaN) and a weight of 1, so they only count towards volume.
+    columns = {'ticker': [], 'source': [], 'created_utc': [], 'score': [], 'weight': []}
+    for frame in iter_record_frames(paths, batch_size):
+        rows = len(frame)
+        columns['ticker'].append(frame['ticker'].astype(str).to_numpy())
+        columns['source'].append(frame['source'].astype(str).to_numpy())
+        columns['created_utc'].append(frame['created_utc'].to_numpy(dtype=np.float64))
+        if 'sentiment_score' in frame.columns:
+            columns['score'].append(pd.to_numeric(frame['sentiment_score'], errors='coerce').to_numpy(dtype=np.float64))
+            columns['weight'].append(pd.to_numeric(frame['relevance_score'], errors='coerce').fillna(1.0)
+                                     .to_numpy(dtype=np.float64))
+        else:
+            columns['score'].append(np.full(rows, np.nan))
+            columns['weight'].append(np.ones(rows))
+    if not columns['ticker']:
+        return {name: np.empty(0, dtype=object if name in ('ticker', 'source') else np.float64) for name in columns}
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+
+def _window_bounds(occupied, codes, starts, window):
+    # Index range, in the occupied cell codes (sorted), of buckets code-window+1..code for each row. starts is
+    # the code of bucket 0 of the row's ticker, so a window never reaches into the previous ticker.
+    return (np.searchsorted(occupied, np.maximum(codes - window, starts - 1), side='right'),
+            np.searchsorted(occupied, codes, side='right'))
+
+
+def _rolling_sum(values, bounds):
+    # Sum of per-cell values within each row's window, as a difference of one cumulative sum
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    lower, upper = bounds
+    return cumulative[upper] - cumulative[lower]
+
+
+def aggregate(tickers, sources, created_utc, scores, weights, bucket_seconds=SENTIMENT_BUCKET_SECONDS,
+              window=SENTIMENT_WINDOW_BUCKETS):
+    """
+    Relevance-weighted rolling sentiment, volume and velocity per ticker and time bucket
+
+    Items are mapped to integer (ticker, bucket) cell codes and summed per occupied cell with np.bincount.
+    Rolling sums are differences of one cumulative sum over the occupied cells, indexed with searchsorted, so
+    time and memory grow with the number of items and output rows, never with the time span covered.
+    Returns one row per ticker and bucket that has items within the rolling window:
+    volume and volume_<source> count the items in the bucket, rolling_volume those in the window,
+    rolling_sentiment is the relevance-weighted mean score in the window (NaN without scored items) and
+    velocity is the change in rolling_volume since the previous bucket.
+    """
+    dated = ~np.isnan(created_utc)
+    if not dated.all():
+        tickers, sources, created_utc, scores, weights = (
+            array[dated] for array in (tickers, sources, created_utc, scores, weights))
+    if len(created_utc) == 0:
+        return pd.DataFrame(columns=['ticker', 'bucket_start', 'volume', 'rolling_volume', 'rolling_sentiment',
+                                     'velocity'])
+
+    # Hash-based factorize rather than np.unique(return_inverse=True), which argsorts the string objects
+    ticker_idx, ticker_names = pd.factorize(tickers, sort=True)
+    source_idx, source_names = pd.factorize(sources, sort=True)
+    origin = np.floor(created_utc.min() / bucket_seconds) * bucket_seconds
+    bucket_idx = ((created_utc - origin) // bucket_seconds).astype(np.int64)
+    n_sources, n_buckets = len(source_names), int(bucket_idx.max()) + 1
+
+    # Occupied cells only, sorted by code (ticker-major, then bucket)
+    occupied, cell_idx = np.unique(ticker_idx.astype(np.int64) * n_buckets + bucket_idx, return_inverse=True)
+    n_cells = len(occupied)
+    source_volume = np.bincount(cell_idx * n_sources + source_idx, minlength=n_cells * n_sources) \
+        .reshape(n_cells, n_sources)
+    volume = source_volume.sum(axis=1)
+    scored = ~np.isnan(scores)
+    weight_sum = np.bincount(cell_idx[scored], weights=weights[scored], minlength=n_cells)
+    weighted_score = np.bincount(cell_idx[scored], weights=weights[scored] * scores[scored], minlength=n_cells)
+
+    # Output rows: each occupied bucket and the buckets after it that it keeps inside a window, up to the
+    # next occupied bucket of the same ticker (or the last bucket overall)
+    ticker_start = occupied - occupied % n_buckets
+    following = np.append(occupied[1:], 0)
+    following = np.where((following > occupied) & (following - ticker_start < n_buckets), following,
+                         ticker_start + n_buckets)
+    spans = np.minimum(following - occupied, window)
+    offsets = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+    codes = np.repeat(occupied, spans) + offsets
+    starts = np.repeat(ticker_start, spans)
+
+    bounds = _window_bounds(occupied, codes, starts, window)
+    rolling_volume = _rolling_sum(volume, bounds)
+    rolling_weight = _rolling_sum(weight_sum, bounds)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rolling_sentiment = np.where(rolling_weight > 0, _rolling_sum(weighted_score, bounds) / rolling_weight, np.nan)
+    # The window of the bucket before a ticker's first one (code starts - 1) is empty
+    velocity = rolling_volume - _rolling_sum(volume, _window_bounds(occupied, codes - 1, starts, window))
+
+    # Per-bucket counts for output rows that are occupied cells themselves
+    cell = np.minimum(np.searchsorted(occupied, codes), n_cells - 1)
+    is_occupied = occupied[cell] == codes
+    result = pd.DataFrame({
+        'ticker': ticker_names[codes // n_buckets],
+        'bucket_start': pd.to_datetime(origin + (codes % n_buckets) * bucket_seconds, unit='s', utc=True),
+        'volume': np.where(is_occupied, volume[cell], 0),
+    })
+    for i, source in enumerate(source_names):
+        result[f'volume_{source}'] = np.where(is_occupied, source_volume[cell, i], 0)
+    result['rolling_volume'] = np.rint(rolling_volume).astype(np.int64)
+    result['rolling_sentiment'] = rolling_sentiment
+    result['velocity'] = np.rint(velocity).astype(np.int64)
+    return result
+
+
+def aggregate_files(paths, bucket_seconds=SENTIMENT_BUCKET_SECONDS, window=SENTIMENT_WINDOW_BUCKETS):
+    arrays = load_arrays(paths)
+    return aggregate(arrays['ticker'], arrays['source'], arrays['created_utc'], arrays['score'], arrays['weight'],
+                     bucket_seconds, window)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling sentiment, volume and velocity per ticker")
+    parser.add_argument('inputs', nargs='+', help="JSONL files or Parquet directories written by the scrapers")
+    parser.add_argument('--bucket-seconds', type=int, default=SENTIMENT_BUCKET_SECONDS)
+    parser.add_argument('--window', type=int, default=SENTIMENT_WINDOW_BUCKETS, help="Rolling window in buckets")
+    parser.add_argument('--output', default='sentiment.csv', help="CSV, or JSONL when the name ends in .jsonl")
+    args = parser.parse_args(argv)
+
+    arrays = load_arrays(args.inputs)
+    start = time.perf_counter()
+    result = aggregate(arrays['ticker'], arrays['source'], arrays['created_utc'], arrays['score'], arrays['weight'],
+                       args.bucket_seconds, args.window)
+    elapsed = time.perf_counter() - start
+    if args.output.endswith('.jsonl'):
+        result.to_json(args.output, orient='records', lines=True, date_format='iso')
+    else:
+        result.to_csv(args.output, index=False)
+    print(f"Aggregated {len(arrays['created_utc'])} items into {len(result)} ticker buckets "
+          f"in {elapsed * 1000:.1f} ms, saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# symbol_index.py
+import json
+import os
+from config import SYMBOL_INDEX_FILE
+
+
+class SymbolIndex:
+    # Local index of symbols, company names and past queries, persisted as JSON.
+    # Only exact matches are answered here; the index is incomplete, so a prefix of a known name may well be
+    # another company's symbol. Anything else falls back to the API and is added here afterwards.
+
+    def __init__(self, path=SYMBOL_INDEX_FILE):
+        self.path = path
+        self.records = {}
+        self._keys = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for record in json.load(f):
+                    self._add_record(record)
+
+    def _add_record(self, record):
+        self.records[record['symbol']] = record
+        for key in [record['symbol'], record.get('name', '')] + record.get('aliases', []):
+            if key.strip():
+                self._keys.setdefault(key.strip().lower(), set()).add(record['symbol'])
+
+    def lookup(self, query):
+        # A symbol match wins; a name or alias shared by several symbols is ambiguous and left to the API
+        symbols = self._keys.get(query.strip().lower(), ())
+        if query.strip().upper() in symbols:
+            return query.strip().upper()
+        if len(symbols) == 1:
+            return next(iter(symbols))
+        return None
+
+    def add(self, symbol, name='', aliases=()):
+        record = self.records.get(symbol, {'symbol': symbol, 'name': name, 'aliases': []})
+        if name and not record.get('name'):
+            record['name'] = name
+        for alias in aliases:
+            if alias.strip().lower() not in (a.lower() for a in record['aliases']):
+                record['aliases'].append(alias.strip())
+        self._add_record(record)
+
+    def message_board_id(self, symbol):
+        return self.records.get(symbol, {}).get('message_board_id')
+
+    def set_message_board_id(self, symbol, message_board_id):
+        self.add(symbol)
+        self.records[symbol]['message_board_id'] = message_board_id
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(list(self.records.values()), f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,140 @@
+# writers.py
+import glob
+import json
+import os
+import time
+import typing
+from contextlib import contextmanager
+from dataclasses import asdict, fields
+from datetime import datetime, timezone
+from config import OUTPUT_FORMAT, PARQUET_ROW_GROUP_SIZE
+from src.records import RedditItem, YahooComment, NewsArticle
+
+EXTENSIONS = {'txt': '.txt', 'jsonl': '.jsonl', 'parquet': '.parquet'}
+
+
+def output_path(output_file, output_format=OUTPUT_FORMAT):
+    return os.path.splitext(output_file)[0] + EXTENSIONS[output_format]
+
+
+class TextWriter:
+    # The original human-readable layout, kept for people reading the files directly
+
+    def __init__(self, path, record_type, append=False):
+        self.f = open(path, 'a' if append else 'w', encoding='utf-8')
+        self._in_post = False
+
+    def write(self, record):
+        f = self.f
+        if isinstance(record, RedditItem):
+            if record.kind == 'post':
+                self._end_post()
+                f.write(f"Title: {record.title}\n")
+                f.write(f"URL: {record.url}\n")
+                if record.text:
+                    f.write(f"Content: {record.text}\n")
+                self._in_post = True
+            else:
+                f.write(f"Comment by {record.author} at {datetime.fromtimestamp(record.created_utc, timezone.utc)}:\n")
+                f.write(f"{record.text}\n")
+                f.write("-" * 40 + "\n")
+        elif isinstance(record, YahooComment):
+            if record.created_utc:
+                time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created_utc))
+            else:
+                time_str = "Unknown Time"
+            f.write(f"{record.author} ({time_str}): {record.text}\n")
+        elif isinstance(record, NewsArticle):
+            f.write(f"Title: {record.title}\n")
+            f.write(f"URL: {record.url}\n")
+            f.write(f"Time Published: {record.time_published}\n")
+            f.write(f"Source: {record.publisher}\n")
+            f.write(f"Summary: {record.text}\n")
+            f.write(f"Relevance Score: {record.relevance_score}\n")
+            f.write(f"Sentiment Score: {record.sentiment_score}\n")
+            f.write(f"Sentiment Label: {record.sentiment_label}\n")
+            f.write("-" * 30 + "\n")
+
+    def _end_post(self):
+        if self._in_post:
+            self.f.write("\n" + "-" * 80 + "\n\n")
+            self._in_post = False
+
+    def close(self):
+        self._end_post()
+        self.f.close()
+
+
+class JsonlWriter:
+    # One JSON object per line, flushed per record so readers can tail the file
+
+    def __init__(self, path, record_type, append=False):
+        self.f = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        self.f.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+def _arrow_schema(pa, record_type):
+    arrow_types = {str: pa.string(), float: pa.float64(), int: pa.int64()}
+    hints = typing.get_type_hints(record_type)
+    columns = []
+    for field in fields(record_type):
+        hint = hints[field.name]
+        nullable = type(None) in typing.get_args(hint)
+        base = next(arg for arg in typing.get_args(hint) if arg is not type(None)) if nullable else hint
+        columns.append(pa.field(field.name, arrow_types[base], nullable=nullable))
+    return pa.schema(columns)
+
+
+class ParquetWriter:
+    # Writes a directory of part files, one per session, buffering at most PARQUET_ROW_GROUP_SIZE rows.
+    # Appending adds a new part, so the directory reads back as a single table with pyarrow or pandas.
+
+    def __init__(self, path, record_type, append=False):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+        self._pa = pa
+        self.schema = _arrow_schema(pa, record_type)
+        os.makedirs(path, exist_ok=True)
+        parts = sorted(glob.glob(os.path.join(path, 'part-*.parquet')))
+        if not append:
+            for part in parts:
+                os.remove(part)
+            parts = []
+        self.writer = pq.ParquetWriter(os.path.join(path, f"part-{len(parts):05d}.parquet"), self.schema)
+        self.rows = []
+
+    def write(self, record):
+        self.rows.append(asdict(record))
+        if len(self.rows) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            self.writer.write_table(self._pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+WRITERS = {'txt': TextWriter, 'jsonl': JsonlWriter, 'parquet': ParquetWriter}
+
+
+@contextmanager
+def open_writer(output_file, record_type, append=False, output_format=OUTPUT_FORMAT):
+    # The file extension follows output_format, e.g. reddit_discussions.txt -> reddit_discussions.jsonl
+    writer = WRITERS[output_format](output_path(output_file, output_format), record_type, append)
+    try:
+        yield writer
+    finally:
+        writer.close()
@@ -1,95 +1,177 @@
 # yahoo_scraper.py
 from yahoofinancials import YahooFinancials
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import http.client
 import json
-import time
-from config import YAHOO_MAX_COMMENTS, YAHOO_API_KEY
+import queue
+import threading
+from src.records import YahooComment, stable_id
+from src.writers import open_writer, output_path
+from urllib.parse import urlsplit
+from config import YAHOO_MAX_COMMENTS, YAHOO_API_KEY, YAHOO_MAX_CONNECTIONS, YAHOO_API_URL
 
+API_HOST = "yh-finance.p.rapidapi.com"
+COUNT_PER_PAGE = 100
+
+
+def _new_connection():
+    api_url = urlsplit(YAHOO_API_URL)
+    if api_url.scheme == 'http':
+        return http.client.HTTPConnection(api_url.netloc)
+    return http.client.HTTPSConnection(api_url.netloc)
+
+
+class ConnectionPool(queue.Queue):
+    # Every request borrows a connection, so the pool also counts the requests sent through it
+
+    def __init__(self):
+        super().__init__()
+        self.requests_made = 0
+        self._count_lock = threading.Lock()
+
+    def borrow(self):
+        with self._count_lock:
+            self.requests_made += 1
+        return self.get()
+
+
+def _fetch_page(pool, headers, message_board_id, offset):
+    # Borrow a connection from the pool so each one is only used by a single thread at a time
+    conn = pool.borrow()
+    try:
+        url = f"/conversations/v2/list?messageBoardId={message_board_id}&offset={offset}&sort_by=newest&count={COUNT_PER_PAGE}"
+        conn.request("GET", url, headers=headers)
+        data = conn.getresponse().read()
+    except (http.client.HTTPException, OSError):
+        conn.close()
+        conn = _new_connection()
+        raise
+    finally:
+        pool.put(conn)
+
+    try:
+        return json.loads(data.decode("utf-8"))
+    except json.JSONDecodeError:
+        return None
+
+
+def _text_of(item):
+    return "".join(content_item.get('text', '') for content_item in item.get('content', [])
+                   if content_item.get('type') == 'text')
+
+
+def _username(users, user_id):
+    if user_id in users:
+        return users[user_id].get('display_name', 'Unknown User')
+    return "Unknown User"
+
+
+def _to_record(item, ticker, users, parent_id=None):
+    text = _text_of(item)
+    user_id = item.get('user_id', 'Unknown User')
+    written_at = item.get('written_at', 0)
+    item_id = item.get('message_id') or item.get('id') or stable_id(parent_id, user_id, written_at, text)
+    return YahooComment(id=str(item_id), ticker=ticker, created_utc=float(written_at), parent_id=parent_id,
+                        author=_username(users, user_id), text=text)
+
+
+def _write_comment(writer, record, comment, ticker, users):
+    for reply in comment.get('replies') or []:
+        writer.write(_to_record(reply, ticker, users, parent_id=record.id))
+    if record.text:
+        writer.write(record)
+
+
+def _message_board_id(ticker, symbol_index):
+    # The board ID never changes for a symbol, so only ask Yahoo the first time
+    message_board_id = symbol_index.message_board_id(ticker) if symbol_index else None
+    if message_board_id:
+        return message_board_id
 
-def fetch_yahoo_comments(ticker, output_file):
     yahoo_financials = YahooFinancials(ticker)
     stock_data = yahoo_financials.get_stock_quote_type_data()
     message_board_id = stock_data[ticker]['messageBoardId']
+    if symbol_index:
+        symbol_index.set_message_board_id(ticker, message_board_id)
+        symbol_index.save()
+    return message_board_id
+
+
+def create_connection_pool():
+    pool = ConnectionPool()
+    for _ in range(YAHOO_MAX_CONNECTIONS):
+        pool.put(_new_connection())
+    return pool
+
+
+def close_connection_pool(pool):
+    while not pool.empty():
+        pool.get().close()
+
+
+def fetch_yahoo_comments(ticker, output_file, symbol_index=None, pool=None, stop_at_id=None, append=False):
+    # Comments come newest first; with stop_at_id (the newest ID from the previous run) only newer ones are written.
+    # Returns the newest comment ID seen, to be passed as stop_at_id next time.
+    message_board_id = _message_board_id(ticker, symbol_index)
 
-    conn = http.client.HTTPSConnection("yh-finance.p.rapidapi.com")
     headers = {
         'x-rapidapi-key': YAHOO_API_KEY,
-        'x-rapidapi-host': "yh-finance.p.rapidapi.com"
+        'x-rapidapi-host': API_HOST
     }
+    owns_pool = pool is None
+    if owns_pool:
+        pool = create_connection_pool()
 
-    offset = 0
-    all_comments = []
-    count_per_page = 100
-    total_fetched = 0
-    while True:
-        url = f"/conversations/v2/list?messageBoardId={message_board_id}&offset={offset}&sort_by=newest&count={count_per_page}"
-        conn.request("GET", url, headers=headers)
-        res = conn.getresponse()
-        data = res.read()
-
-        try:
-            json_data = json.loads(data.decode("utf-8"))
-        except json.JSONDecodeError:
-            print("Error: Could not decode JSON response.")
-            break
-
-        if 'conversation' not in json_data or 'comments' not in json_data['conversation']:
-            print('Error: conversation or comments not in the response, maybe the API is down')
-            break
-
-        comments_this_page = json_data['conversation']['comments']
-        total_fetched += len(comments_this_page)
-        all_comments.extend(comments_this_page)
-
-        if not json_data['conversation']['has_next'] or total_fetched >= YAHOO_MAX_COMMENTS:
-            break
-
-        offset += count_per_page
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for comment in all_comments:
-            user_id = comment.get('user_id', 'Unknown User')
-            timestamp = comment.get('written_at', 0)
-            user_display_name = comment.get("user_display_name", "")
-            if user_id in json_data['conversation']['users']:
-                username = json_data['conversation']['users'][user_id].get('display_name', 'Unknown User')
-            else:
-                username = "Unknown User"
-
-            if timestamp:
-                time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
-            else:
-                time_str = "Unknown Time"
-
-            text_content = ""
-            if 'content' in comment:
-                for content_item in comment['content']:
-                    if content_item.get('type') == 'text':
-                        text_content += content_item.get('text', '')
-
-            if 'replies' in comment and comment['replies']:
-                for reply in comment['replies']:
-                    user_id = reply.get('user_id', 'Unknown User')
-                    timestamp = reply.get('written_at', 0)
-                    user_display_name = reply.get("user_display_name", "")
-                    if user_id in json_data['conversation']['users']:
-                        username_reply = json_data['conversation']['users'][user_id].get('display_name', 'Unknown User')
-                        if not user_display_name:
-                            user_display_name = username_reply
-                    else:
-                        username_reply = 'Unknown User'
-
-                    if timestamp:
-                        time_str_reply = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
-                    else:
-                        time_str_reply = "Unknown Time"
-                    reply_text = ""
-                    if 'content' in reply:
-                        for content_item in reply['content']:
-                            if content_item.get('type') == 'text':
-                                reply_text += content_item.get('text', '')
-                    f.write(f"{username_reply} ({time_str_reply}): {reply_text}\n")
-
-            if text_content:
-                f.write(f"{username} ({time_str}): {text_content}\n")
-    print(f"Comments saved to {output_file}")
+    # Offsets are predictable, so keep a few pages in flight and write each one in order as it lands
+    offsets = iter(range(0, YAHOO_MAX_COMMENTS, COUNT_PER_PAGE))
+    users = {}
+    pending = deque()
+    newest_id = None
+    reached_seen = False
+    # Incremental polls rarely need more than the first page, so don't prefetch ahead for them
+    in_flight = 1 if stop_at_id else YAHOO_MAX_CONNECTIONS
+    with open_writer(output_file, YahooComment, append=append) as writer, \
+            ThreadPoolExecutor(max_workers=YAHOO_MAX_CONNECTIONS) as executor:
+        def submit_next():
+            offset = next(offsets, None)
+            if offset is not None:
+                pending.append(executor.submit(_fetch_page, pool, headers, message_board_id, offset))
+
+        for _ in range(in_flight):
+            submit_next()
+
+        while pending:
+            try:
+                json_data = pending.popleft().result()
+            except (http.client.HTTPException, OSError) as e:
+                print(f"Error: request failed: {e}")
+                break
+            if json_data is None:
+                print("Error: Could not decode JSON response.")
+                break
+            if 'conversation' not in json_data or 'comments' not in json_data['conversation']:
+                print('Error: conversation or comments not in the response, maybe the API is down')
+                break
+
+            conversation = json_data['conversation']
+            users.update(conversation.get('users', {}))
+            for comment in conversation['comments']:
+                record = _to_record(comment, ticker, users)
+                if record.id == stop_at_id:
+                    reached_seen = True
+                    break
+                newest_id = newest_id or record.id
+                _write_comment(writer, record, comment, ticker, users)
+
+            if reached_seen or not conversation['has_next']:
+                break
+            submit_next()
+
+        for future in pending:
+            future.cancel()
+
+    if owns_pool:
+        close_connection_pool(pool)
+    print(f"Comments saved to {output_path(output_file)}")
+    return newest_id